@@ -1,15 +1,22 @@
+import numpy as np
 from pandas import DataFrame
 
 RET_METHODS = {'simple', 'log'}
-MA_METHODS = {'sma', 'ema', 'wma', 'hma', 'wilders', 'kama', 'fma'}
+# kama is left out: it takes n_er/n_fast/n_slow rather than a single n, so
+# it cannot stand in for the other moving averages inside an indicator
+MA_METHODS = {'sma', 'ema', 'wma', 'hma', 'wilders', 'fma'}
 RETURN_STRUCTS = {'numpy', 'pandas'}
 DDOF = {0, 1}
+DTYPES = (np.float64, np.float32)
 
 DF_ERR_MESSAGE = "Error: 'df' must be a Pandas DataFrame"
 COLUMN_ERR_MESSAGE = "Invalid Column: column name not found in dataframe"
 RET_ERR_MESSAGE = f"Invalid method. Valid methods: {RET_METHODS}"
 MA_ERR_MESSAGE = f"Invalid method. Valid methods: {MA_METHODS}"
+KAMA_ERR_MESSAGE = ("Invalid method: 'kama' is not supported as ma_method. "
+                    "Call kama directly instead")
 RETURN_STRUCTS_ERR_MESSAGE = f"Invalid return_struct. Valid return_structs: {RETURN_STRUCTS}"
+DTYPE_ERR_MESSAGE = "Invalid dtype. Valid dtypes: np.float64, np.float32"
 
 type_dict = {
     'column': str,
@@ -42,6 +49,10 @@ type_dict = {
     'af_step': float,
     'max_af': float,
     'add_col': bool,
+    'parallel': bool,
+    'max_workers': int,
+    'tr_values': np.ndarray,
+    'atr_values': np.ndarray,
     }
 
 def int_err_message(var):
@@ -55,22 +66,31 @@ def string_err_message(var):
 
 def bool_err_message(var):
     return f"Error: {var} must be of type bool"
+
+def out_err_message(shape):
+    return f"Error: out must be a writeable float64 numpy array of shape {shape}"
+
+def array_err_message(var, shape):
+    return f"Error: {var} must be a numpy array of shape {shape}"
   
 def check_errors(df=None, column=None, ret_method=None, ma_method=None,
-                 ddof=None, return_struct=None, **kwargs):
+                 ddof=None, return_struct=None, dtype=None, out=None,
+                 out_cols=1, **kwargs):
 
     if df is not None and type(df) is not DataFrame:
         raise Exception(DF_ERR_MESSAGE)
 
-    if column is not None and column not in df.columns:
-        raise Exception(COLUMN_ERR_MESSAGE)
-
     if column is not None and type(column) is not str:
         raise TypeError(string_err_message('column'))
 
+    if column is not None and column not in df.columns:
+        raise Exception(COLUMN_ERR_MESSAGE)
+
     if ret_method is not None and ret_method not in RET_METHODS:
         raise Exception(RET_ERR_MESSAGE)
 
+    if ma_method == 'kama':
+        raise Exception(KAMA_ERR_MESSAGE)
     if ma_method is not None and ma_method not in MA_METHODS:
         raise Exception(MA_ERR_MESSAGE)
 
@@ -80,14 +100,29 @@ def check_errors(df=None, column=None, ret_method=None, ma_method=None,
     if return_struct is not None and return_struct not in RETURN_STRUCTS:
         raise Exception(RETURN_STRUCTS_ERR_MESSAGE)
 
+    if dtype is not None and dtype not in DTYPES:
+        raise Exception(DTYPE_ERR_MESSAGE)
+
+    if out is not None:
+        out_shape = (len(df),) if out_cols == 1 else (len(df), out_cols)
+        if (type(out) is not np.ndarray or out.dtype != np.float64 or
+                out.shape != out_shape or not out.flags.writeable):
+            raise TypeError(out_err_message(out_shape))
+
     for k, v in kwargs.items():
-        if type_dict[k] != type(v):
-            if type_dict[k] == int:
+        expected = type_dict[k]
+        if expected is np.ndarray:
+            # Precomputed inputs are optional and must line up with df
+            if v is not None and (type(v) is not np.ndarray or
+                                  v.shape != (len(df),)):
+                raise TypeError(array_err_message(k, (len(df),)))
+        elif type(v) is not expected:
+            if expected is int:
                 raise TypeError(int_err_message(k))
-            elif type_dict[k] == float:
+            elif expected is float:
                 raise TypeError(float_err_message(k))
-            elif type_dict[k] == str:
+            elif expected is str:
                 raise TypeError(string_err_message(k))
-            elif type_dict[k] == bool:
+            elif expected is bool:
                 raise TypeError(bool_err_message(k))
                 
@@ -1,8 +1,8 @@
 import numpy as np
-from numba import jit
+from numba import njit, prange
 
 
-@jit
+@njit(cache=True, nogil=True)
 def wilders_loop(data, n):
     """
     Wilder's Moving Average Helper Loop
@@ -14,7 +14,7 @@ def wilders_loop(data, n):
     return data
 
 
-@jit
+@njit(cache=True, nogil=True)
 def kama_loop(data, sc, n_er, length):
     """
     Kaufman's Adaptive Moving Average Helper Loop
@@ -29,7 +29,7 @@ def kama_loop(data, sc, n_er, length):
     return kama
 
 
-@jit
+@njit(cache=True, nogil=True)
 def psar_loop(psar, high, low, af_step, max_af):
     """
     Wilder's Parabolic Stop and Reversal Helper Loop
@@ -41,10 +41,6 @@ def psar_loop(psar, high, low, af_step, max_af):
     af = af_step
     high_point = high[0]
     low_point = low[0]
-    psar_up = np.empty(length)
-    psar_up.fill(np.nan)
-    psar_down = np.empty(length)
-    psar_down.fill(np.nan)
 
     for i in range(2, length):
 
@@ -88,15 +84,10 @@ def psar_loop(psar, high, low, af_step, max_af):
 
         uptrend = uptrend ^ reversal
 
-        if uptrend:
-            psar_up[i] = psar[i]
-        else:
-            psar_down[i] = psar[i]
-
     return psar
 
 
-@jit
+@njit(cache=True, nogil=True)
 def supertrend_loop(close, basic_ub, basic_lb, n):
     """
     Supertrend Helper Loop
@@ -104,37 +95,38 @@ def supertrend_loop(close, basic_ub, basic_lb, n):
     """
 
     length = len(close)
-    final_ub = np.zeros(length)
-    final_lb = np.zeros(length)
     supertrend = np.zeros(length)
+    prev_ub = 0.0
+    prev_lb = 0.0
+    prev_st = 0.0
 
     for i in range(n, length):
 
-        if basic_ub[i] < final_ub[i-1] or close[i-1] > final_ub[i-1]:
-            final_ub[i] = basic_ub[i]
+        ub = (basic_ub[i] if basic_ub[i] < prev_ub or close[i-1] > prev_ub
+              else prev_ub)
+        lb = (basic_lb[i] if basic_lb[i] > prev_lb or close[i-1] < prev_lb
+              else prev_lb)
+
+        if prev_st == prev_ub and close[i] <= ub:
+            st = ub
+        elif prev_st == prev_ub and close[i] > ub:
+            st = lb
+        elif prev_st == prev_lb and close[i] >= lb:
+            st = lb
+        elif prev_st == prev_lb and close[i] < lb:
+            st = ub
         else:
-            final_ub[i] = final_ub[i-1]
+            st = 0.00
 
-        if basic_lb[i] > final_lb[i-1] or close[i-1] < final_lb[i-1]:
-            final_lb[i] = basic_lb[i]
-        else:
-            final_lb[i] = final_lb[i-1]
-
-        if supertrend[i-1] == final_ub[i-1] and close[i] <= final_ub[i]:
-            supertrend[i] = final_ub[i]
-        elif supertrend[i-1] == final_ub[i-1] and close[i] > final_ub[i]:
-            supertrend[i] = final_lb[i]
-        elif supertrend[i-1] == final_lb[i-1] and close[i] >= final_lb[i]:
-            supertrend[i] = final_lb[i]
-        elif supertrend[i-1] == final_lb[i-1] and close[i] < final_lb[i]:
-            supertrend[i] = final_ub[i]
-        else:
-            supertrend[i] = 0.00
+        supertrend[i] = st
+        prev_ub = ub
+        prev_lb = lb
+        prev_st = st
 
     return supertrend
 
 
-@jit
+@njit(cache=True, nogil=True)
 def fib_loop(n):
     """
     Fibonacci loop
@@ -147,3 +139,519 @@ def fib_loop(n):
 
     return fib[3:]
 
+
+@njit(cache=True, nogil=True)
+def true_range_loop(high, low, close, tr):
+    """
+    True Range Helper Loop
+    Computes the three ranges and their max in a single pass, skipping
+    NaNs the same way np.nanmax does.  The result is written into tr.
+    """
+
+    length = len(close)
+
+    if length == 0:
+        return tr
+
+    tr[0] = high[0] - low[0]
+
+    for i in range(1, length):
+        val = high[i] - low[i]
+        hc = abs(high[i] - close[i-1])
+        lc = abs(low[i] - close[i-1])
+
+        if np.isnan(val) or hc > val:
+            val = hc
+        if np.isnan(val) or lc > val:
+            val = lc
+
+        tr[i] = val
+
+    return tr
+
+
+@njit(cache=True, nogil=True)
+def kahan_step(x, total, comp):
+    """
+    Compensated Summation Step
+    Adds x to total with Kahan compensation, returning the updated
+    (total, comp) pair. Pass -x to take a value back out of a running
+    window sum, as pandas' rolling sum does.
+    """
+
+    y = x - comp
+    t = total + y
+    comp = (t - total) - y
+
+    return t, comp
+
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def adx_loop(high, low, close, n, wilders):
+    """
+    Average Directional Index Helper Loop
+    Computes the true range, directional movement, DI+/DI- and ADX in
+    a single pass.  The true range and ADX are smoothed with an SMA, or
+    with Wilder's moving average when wilders is True.  The window sums
+    are compensated like pandas' rolling sums, and a missing true range
+    only blanks the DI values of the windows that contain it.
+    """
+
+    length = len(close)
+    tr = true_range_loop(high, low, close, np.empty(length))
+    pos = np.zeros(length)
+    neg = np.zeros(length)
+    dx = np.zeros(length)
+    di_pos = np.full(length, np.nan)
+    di_neg = np.full(length, np.nan)
+    adx = np.full(length, np.nan)
+
+    tr_sum, tr_comp, tr_nans = 0.0, 0.0, 0
+    pos_sum, pos_comp, pos_nonzero = 0.0, 0.0, 0
+    neg_sum, neg_comp, neg_nonzero = 0.0, 0.0, 0
+    dx_sum, dx_comp, dx_nonzero = 0.0, 0.0, 0
+    atr = 0.0
+
+    for i in range(length):
+        if i > 0:
+            up = high[i] - high[i-1]
+            dn = low[i-1] - low[i]
+            # A missing move counts as no move, so the other side still wins
+            if up != up:
+                up = 0.0
+            if dn != dn:
+                dn = 0.0
+            if up > dn and up > 0:
+                pos[i] = up
+            if dn > up and dn > 0:
+                neg[i] = dn
+
+        if np.isnan(tr[i]):
+            tr_nans += 1
+        else:
+            tr_sum, tr_comp = kahan_step(tr[i], tr_sum, tr_comp)
+        pos_sum, pos_comp = kahan_step(pos[i], pos_sum, pos_comp)
+        neg_sum, neg_comp = kahan_step(neg[i], neg_sum, neg_comp)
+        pos_nonzero += pos[i] != 0.0
+        neg_nonzero += neg[i] != 0.0
+        if i >= n:
+            if np.isnan(tr[i-n]):
+                tr_nans -= 1
+            else:
+                tr_sum, tr_comp = kahan_step(-tr[i-n], tr_sum, tr_comp)
+            pos_sum, pos_comp = kahan_step(-pos[i-n], pos_sum, pos_comp)
+            neg_sum, neg_comp = kahan_step(-neg[i-n], neg_sum, neg_comp)
+            pos_nonzero -= pos[i-n] != 0.0
+            neg_nonzero -= neg[i-n] != 0.0
+
+        # Windows of zeros sum to exactly zero, whatever drift is left over
+        if pos_nonzero == 0:
+            pos_sum, pos_comp = 0.0, 0.0
+        if neg_nonzero == 0:
+            neg_sum, neg_comp = 0.0, 0.0
+
+        if i < n - 1:
+            if wilders:
+                adx[i] = 0.0
+            continue
+
+        if wilders and i >= n:
+            atr = (atr * (n-1) + tr[i]) / n
+        elif tr_nans > 0:
+            atr = np.nan
+        else:
+            atr = tr_sum / n
+
+        di_pos[i] = 100 * max(pos_sum, 0.0) / atr
+        di_neg[i] = 100 * max(neg_sum, 0.0) / atr
+        val = 100 * abs(di_pos[i] - di_neg[i]) / (di_pos[i] + di_neg[i])
+        if not np.isnan(val):
+            dx[i] = val
+
+        dx_sum, dx_comp = kahan_step(dx[i], dx_sum, dx_comp)
+        dx_nonzero += dx[i] != 0.0
+        if i >= n:
+            dx_sum, dx_comp = kahan_step(-dx[i-n], dx_sum, dx_comp)
+            dx_nonzero -= dx[i-n] != 0.0
+        if dx_nonzero == 0:
+            dx_sum, dx_comp = 0.0, 0.0
+
+        if wilders and i >= n:
+            adx[i] = (adx[i-1] * (n-1) + dx[i]) / n
+        else:
+            adx[i] = max(dx_sum, 0.0) / n
+
+    return adx, di_pos, di_neg
+
+
+@njit(cache=True, nogil=True, fastmath={'contract'})
+def bands_loop(mid, spread, upper_factor, lower_factor, out):
+    """
+    Channel Bands Helper Loop
+    Writes mid - spread * lower_factor and mid + spread * upper_factor
+    into the two columns of out.  Each row is independent, so the loop
+    vectorizes and the multiply-add can be fused.
+    """
+
+    for i in range(len(mid)):
+        out[i, 0] = mid[i] - spread[i] * lower_factor
+        out[i, 1] = mid[i] + spread[i] * upper_factor
+
+    return out
+
+
+@njit(cache=True, nogil=True, parallel=True, fastmath={'contract'})
+def bands_loop_parallel(mid, spread, upper_factor, lower_factor, out):
+    """
+    Multi-threaded Channel Bands Helper Loop
+    Same as bands_loop with the rows split across Numba's thread pool.
+    Numba's default threading layer must not be entered from several
+    Python threads at once, so this is only called on explicit request.
+    """
+
+    for i in prange(len(mid)):
+        out[i, 0] = mid[i] - spread[i] * lower_factor
+        out[i, 1] = mid[i] + spread[i] * upper_factor
+
+    return out
+
+
+@njit(cache=True, nogil=True)
+def rolling_std_welford(data, n, ddof):
+    """
+    Rolling Standard Deviation Helper Loop
+    Welford's update is applied as values enter and leave the window,
+    so each step is O(1) instead of recomputing the whole window.
+    A window containing a NaN returns NaN, matching pandas' rolling std.
+    """
+
+    length = len(data)
+    std = np.full(length, np.nan)
+
+    if n - ddof <= 0:
+        return std
+
+    nobs = 0
+    nans = 0
+    mean = 0.0
+    ssqd = 0.0
+
+    for i in range(length):
+        x = data[i]
+        if np.isnan(x):
+            nans += 1
+        else:
+            nobs += 1
+            delta = x - mean
+            mean += delta / nobs
+            ssqd += delta * (x - mean)
+
+        if i >= n:
+            x = data[i-n]
+            if np.isnan(x):
+                nans -= 1
+            else:
+                nobs -= 1
+                if nobs == 0:
+                    mean = 0.0
+                    ssqd = 0.0
+                else:
+                    delta = x - mean
+                    mean -= delta / nobs
+                    ssqd -= delta * (x - mean)
+
+        if i >= n - 1 and nans == 0:
+            std[i] = np.sqrt(max(ssqd, 0.0) / (n - ddof))
+
+    return std
+
+
+
+@njit(cache=True, nogil=True)
+def rolling_min_max(low, high, n):
+    """
+    Rolling Min/Max Helper Loop
+    Returns the rolling minimum of low and the rolling maximum of high.
+    Each keeps a monotonic deque of indices, so every value is pushed and
+    popped at most once. A window containing a NaN returns NaN, matching
+    pandas' rolling min/max.
+    """
+
+    length = len(low)
+    mins = np.full(length, np.nan)
+    maxs = np.full(length, np.nan)
+
+    if n < 1:
+        return mins, maxs
+
+    min_idx = np.empty(length, np.int64)
+    max_idx = np.empty(length, np.int64)
+    min_head = 0
+    min_tail = 0
+    max_head = 0
+    max_tail = 0
+    low_nans = 0
+    high_nans = 0
+
+    for i in range(length):
+        if np.isnan(low[i]):
+            low_nans += 1
+        else:
+            while min_tail > min_head and low[min_idx[min_tail-1]] >= low[i]:
+                min_tail -= 1
+            min_idx[min_tail] = i
+            min_tail += 1
+
+        if np.isnan(high[i]):
+            high_nans += 1
+        else:
+            while max_tail > max_head and high[max_idx[max_tail-1]] <= high[i]:
+                max_tail -= 1
+            max_idx[max_tail] = i
+            max_tail += 1
+
+        if i >= n:
+            if np.isnan(low[i-n]):
+                low_nans -= 1
+            if np.isnan(high[i-n]):
+                high_nans -= 1
+
+        while min_head < min_tail and min_idx[min_head] <= i - n:
+            min_head += 1
+        while max_head < max_tail and max_idx[max_head] <= i - n:
+            max_head += 1
+
+        if i >= n - 1:
+            if low_nans == 0:
+                mins[i] = low[min_idx[min_head]]
+            if high_nans == 0:
+                maxs[i] = high[max_idx[max_head]]
+
+    return mins, maxs
+
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def percent_k_loop(close, low, high, n):
+    """
+    Stochastic %K Helper Loop
+    Walks the same monotonic deques as rolling_min_max, but writes %K
+    from the current window extremes directly instead of returning the
+    rolling low and high arrays.
+    """
+
+    length = len(close)
+    percent_k = np.full(length, np.nan)
+
+    if n < 1:
+        return percent_k
+
+    min_idx = np.empty(length, np.int64)
+    max_idx = np.empty(length, np.int64)
+    min_head = 0
+    min_tail = 0
+    max_head = 0
+    max_tail = 0
+    low_nans = 0
+    high_nans = 0
+
+    for i in range(length):
+        if np.isnan(low[i]):
+            low_nans += 1
+        else:
+            while min_tail > min_head and low[min_idx[min_tail-1]] >= low[i]:
+                min_tail -= 1
+            min_idx[min_tail] = i
+            min_tail += 1
+
+        if np.isnan(high[i]):
+            high_nans += 1
+        else:
+            while max_tail > max_head and high[max_idx[max_tail-1]] <= high[i]:
+                max_tail -= 1
+            max_idx[max_tail] = i
+            max_tail += 1
+
+        if i >= n:
+            if np.isnan(low[i-n]):
+                low_nans -= 1
+            if np.isnan(high[i-n]):
+                high_nans -= 1
+
+        while min_head < min_tail and min_idx[min_head] <= i - n:
+            min_head += 1
+        while max_head < max_tail and max_idx[max_head] <= i - n:
+            max_head += 1
+
+        if i >= n - 1 and low_nans == 0 and high_nans == 0:
+            lowest = low[min_idx[min_head]]
+            percent_k[i] = ((close[i] - lowest) /
+                            (high[max_idx[max_head]] - lowest) * 100)
+
+    return percent_k
+
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def ultimate_osc_loop(bp, tr, n_fast, n_med, n_slow):
+    """
+    Ultimate Oscillator Helper Loop
+    Builds one cumulative sum each for buying pressure and true range,
+    then differences them for all three windows in a single pass.
+    A window containing a NaN returns NaN, matching pandas' rolling sum.
+    """
+
+    length = len(bp)
+    bp_csum = np.zeros(length + 1)
+    tr_csum = np.zeros(length + 1)
+    nan_csum = np.zeros(length + 1, np.int64)
+
+    for i in range(length):
+        bp_nan = np.isnan(bp[i])
+        tr_nan = np.isnan(tr[i])
+        bp_csum[i+1] = bp_csum[i] + (0.0 if bp_nan else bp[i])
+        tr_csum[i+1] = tr_csum[i] + (0.0 if tr_nan else tr[i])
+        nan_csum[i+1] = nan_csum[i] + (1 if bp_nan or tr_nan else 0)
+
+    ult_osc = np.full(length, np.nan)
+
+    if min(n_fast, n_med, n_slow) < 1:
+        return ult_osc
+
+    n_max = max(n_fast, n_med, n_slow)
+
+    for i in range(n_max, length + 1):
+        if nan_csum[i] - nan_csum[i-n_max] > 0:
+            continue
+
+        first = ((bp_csum[i] - bp_csum[i-n_fast]) /
+                 (tr_csum[i] - tr_csum[i-n_fast]))
+        second = ((bp_csum[i] - bp_csum[i-n_med]) /
+                  (tr_csum[i] - tr_csum[i-n_med]))
+        third = ((bp_csum[i] - bp_csum[i-n_slow]) /
+                 (tr_csum[i] - tr_csum[i-n_slow]))
+
+        ult_osc[i-1] = (first * 4 + second * 2 + third) / 7 * 100
+
+    return ult_osc
+
+
+@njit(cache=True, nogil=True)
+def ewm_step(cur, weighted, old_wt, alpha):
+    """
+    Exponential Weighted Mean Step
+    One step of pandas' ewm(adjust=False, ignore_na=False).mean(),
+    returning the updated (weighted, old_wt) pair. NaN inputs decay the
+    previous weight instead of resetting it, as pandas does.
+    """
+
+    if not np.isnan(weighted):
+        old_wt *= 1.0 - alpha
+        if not np.isnan(cur):
+            if weighted != cur:
+                weighted = old_wt * weighted + alpha * cur
+                total_wt = old_wt + alpha
+                if total_wt != 1.0:
+                    weighted /= total_wt
+            old_wt = 1.0
+    elif not np.isnan(cur):
+        weighted = cur
+
+    return weighted, old_wt
+
+
+@njit(cache=True, nogil=True)
+def ema_loop(data, n, seed, ema):
+    """
+    Exponential Moving Average Helper Loop
+    NaN before n-1, seed at n-1, then pandas' ewm(span=n, adjust=False)
+    recurrence over the rest of data, written into ema.
+    """
+
+    length = len(data)
+    alpha = 1.0 / (1.0 + (n - 1) / 2)
+    weighted = np.nan
+    old_wt = 1.0
+
+    for i in range(length):
+        if i < n - 1:
+            cur = np.nan
+        elif i == n - 1:
+            cur = seed
+        else:
+            cur = data[i]
+        weighted, old_wt = ewm_step(cur, weighted, old_wt, alpha)
+        ema[i] = weighted
+
+    return ema
+
+
+@njit(cache=True, nogil=True)
+def macd_loop(data, n_fast, n_slow, n_macd, seed_fast, seed_slow, macd,
+              signal):
+    """
+    MACD Helper Loop
+    Runs the fast EMA, the slow EMA and the signal line EMA side by side
+    in a single pass. Each EMA is NaN before n-1, takes its seed at n-1
+    and then follows pandas' ewm(span=n, adjust=False) recurrence. The
+    signal line is seeded with the average of the first n_macd MACD
+    values. The difference is written into macd, the signal into signal.
+    """
+
+    length = len(data)
+    alpha_fast = 1.0 / (1.0 + (n_fast - 1) / 2)
+    alpha_slow = 1.0 / (1.0 + (n_slow - 1) / 2)
+    alpha_signal = 1.0 / (1.0 + (n_macd - 1) / 2)
+    fast = np.nan
+    slow = np.nan
+    sig = np.nan
+    wt_fast = 1.0
+    wt_slow = 1.0
+    wt_signal = 1.0
+    macd_sum = 0.0
+
+    for i in range(length):
+        if i < n_fast - 1:
+            cur = np.nan
+        elif i == n_fast - 1:
+            cur = seed_fast
+        else:
+            cur = data[i]
+        fast, wt_fast = ewm_step(cur, fast, wt_fast, alpha_fast)
+
+        if i < n_slow - 1:
+            cur = np.nan
+        elif i == n_slow - 1:
+            cur = seed_slow
+        else:
+            cur = data[i]
+        slow, wt_slow = ewm_step(cur, slow, wt_slow, alpha_slow)
+
+        diff = fast - slow
+        macd[i] = diff
+
+        if i < n_macd - 1:
+            macd_sum += diff
+            cur = np.nan
+        elif i == n_macd - 1:
+            cur = (macd_sum + diff) / n_macd
+        else:
+            cur = diff
+        sig, wt_signal = ewm_step(cur, sig, wt_signal, alpha_signal)
+        signal[i] = sig
+
+    return macd, signal
+
+
+@njit(cache=True, nogil=True)
+def macd_many_loop(prices, n_fast, n_slow, n_macd, seeds_fast, seeds_slow,
+                   macd):
+    """
+    Batched MACD Helper Loop
+    Runs macd_loop down every column of prices, writing the MACD into
+    macd[:, j, 0] and the signal into macd[:, j, 1].
+    """
+
+    for j in range(prices.shape[1]):
+        macd_loop(prices[:, j], n_fast, n_slow, n_macd, seeds_fast[j],
+                  seeds_slow[j], macd[:, j, 0], macd[:, j, 1])
+
+    return macd
@@ -1,7 +1,15 @@
 import numpy as np
 import pandas as pd
 from check_errors import check_errors
-from helper_loops import wilders_loop, kama_loop, fib_loop
+from helper_loops import wilders_loop, kama_loop, fib_loop, ema_loop
+
+
+def _sma_np(data, n):
+    """
+    Simple Moving Average of a 1-d ndarray
+    """
+
+    return pd.Series(data, copy=False).rolling(window=n).mean().to_numpy()
 
 
 def sma(df, column='close', n=20, add_col=False, return_struct='numpy'):
@@ -39,15 +47,52 @@ def sma(df, column='close', n=20, add_col=False, return_struct='numpy'):
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    sma = df[column].rolling(window=n).mean()
+    sma = _sma_np(df[column].to_numpy(), n)
 
-    if add_col == True:
+    if add_col:
         df[f'sma({n})'] = sma
         return df
     elif return_struct == 'pandas':
-        return sma.to_frame(name=f'sma({n})')
+        return pd.DataFrame(sma, columns=[f'sma({n})'],
+                            index=df.index, copy=False)
     else:
-        return sma.to_numpy()
+        return sma
+
+
+def _ema_seed(data, n):
+    """
+    Simple average of the first n values of a 1-d ndarray, used as the
+    starting value of an n-period EMA
+    """
+
+    if n < 1:
+        raise ValueError("span must satisfy: span >= 1")
+
+    return data[:n].mean() if len(data) >= n else np.nan
+
+
+def _ema_seeds(data, n):
+    """
+    Column-wise _ema_seed of a Fortran-ordered 2-d ndarray
+    """
+
+    if n < 1:
+        raise ValueError("span must satisfy: span >= 1")
+
+    if len(data) >= n:
+        return data[:n].mean(axis=0)
+    return np.full(data.shape[1], np.nan)
+
+
+def _ema_np(data, n):
+    """
+    Exponential Moving Average of a 1-d ndarray
+    Seeded with the simple average of the first n values
+    """
+
+    _data = np.ascontiguousarray(data, dtype=np.float64)
+
+    return ema_loop(_data, n, _ema_seed(data, n), np.empty(len(_data)))
 
 
 def ema(df, column='close', n=20, add_col=False, return_struct='numpy'):
@@ -85,17 +130,28 @@ def ema(df, column='close', n=20, add_col=False, return_struct='numpy'):
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    first_value = df[column].iloc[:n].rolling(window=n).mean()
-    _ema = pd.concat([first_value, df[column][n:]])
-    ema = _ema.ewm(span=n, adjust=False).mean()
+    ema = _ema_np(df[column].to_numpy(), n)
 
-    if add_col == True:
+    if add_col:
         df[f'ema({n})'] = ema
         return df
     elif return_struct == 'pandas':
-        return ema.to_frame(name=f'ema({n})')
+        return pd.DataFrame(ema, columns=[f'ema({n})'],
+                            index=df.index, copy=False)
     else:
-        return ema.to_numpy()
+        return ema
+
+
+def _wma_np(data, n):
+    """
+    Weighted Moving Average of a 1-d ndarray
+    """
+
+    weights = np.arange(1, n + 1, 1)
+    wma = pd.Series(data, copy=False).rolling(n).apply(
+        lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+
+    return wma.to_numpy()
 
 
 def wma(df, column='close', n=20, add_col=False, return_struct='numpy'):
@@ -133,17 +189,24 @@ def wma(df, column='close', n=20, add_col=False, return_struct='numpy'):
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    weights = np.arange(1, n + 1, 1)
-    wma = df[column].rolling(n).apply(lambda x: np.dot(x, weights) /
-                                      weights.sum(), raw=True)
+    wma = _wma_np(df[column].to_numpy(), n)
 
-    if add_col == True:
+    if add_col:
         df[f'wma({n})'] = wma
         return df
     elif return_struct == 'pandas':
-        return wma.to_frame(name=f'wma({n})')
+        return pd.DataFrame(wma, columns=[f'wma({n})'],
+                            index=df.index, copy=False)
     else:
-        return wma.to_numpy()
+        return wma
+
+
+def _hma_np(data, n):
+    """
+    Hull Moving Average of a 1-d ndarray
+    """
+
+    return _wma_np(2 * _wma_np(data, n//2) - _wma_np(data, n), int(n ** 0.5))
 
 
 def hma(df, column='close', n=20, add_col=False, return_struct='numpy'):
@@ -181,20 +244,34 @@ def hma(df, column='close', n=20, add_col=False, return_struct='numpy'):
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    wma_1 = wma(df, column=column, n=n//2)
-    wma_2 = wma(df, column=column, n=n)
-    _df = pd.DataFrame(2 * wma_1 - wma_2, columns=[column])
-    hma = wma(_df, column=column, n=int(n ** 0.5))
+    hma = _hma_np(df[column].to_numpy(), n)
 
-    if add_col == True:
+    if add_col:
         df[f'hma({n})'] = hma
         return df
     elif return_struct == 'pandas':
-        return pd.DataFrame(hma, columns=[f'hma({n})'], index=df.index)
+        return pd.DataFrame(hma, columns=[f'hma({n})'],
+                            index=df.index, copy=False)
     else:
         return hma
 
 
+def _wilders_np(data, n):
+    """
+    Wilder's Moving Average of a 1-d ndarray
+    Values before the first full window are 0
+    """
+
+    _arr = np.array(data, dtype=float)
+    _arr[:n] = 0
+    if len(data) >= n:
+        first_value = data[:n].mean()
+        if not np.isnan(first_value):
+            _arr[n-1] = first_value
+
+    return wilders_loop(_arr, n)
+
+
 def wilders_ma(df, column='close', n=20, add_col=False, return_struct='numpy'):
     """ Wilder's Moving Average
     
@@ -230,17 +307,15 @@ def wilders_ma(df, column='close', n=20, add_col=False, return_struct='numpy'):
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    first_value = df[column].iloc[:n].rolling(window=n).mean().fillna(0)
-    _arr = (pd.concat([first_value, df[column].iloc[n:]])).to_numpy()
-    wilders = wilders_loop(_arr, n)
+    wilders = _wilders_np(df[column].to_numpy(), n)
 
-    if add_col == True:
+    if add_col:
         df[f'wilders({n})'] = wilders
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(wilders,
                             columns=[f'wilders({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return wilders
 
@@ -286,22 +361,37 @@ def kama(df, column='close', n_er=10, n_fast=2, n_slow=30,
     er = change / vol
     fast = 2 / (n_fast + 1)
     slow = 2 / (n_slow + 1)
-    sc = ((er * (fast - slow) + slow) ** 2).to_numpy()
+    sc = ((er * (fast - slow) + slow) ** 2).to_numpy(copy=False)
     length = len(df)
 
     kama = kama_loop(df[column].to_numpy(), sc, n_er, length)
 
-    if add_col == True:
+    if add_col:
         df[f'kama{n_er,n_fast,n_slow}'] = kama
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(kama,
                             columns=[f'kama({n_er},{n_fast},{n_slow})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return kama
 
 
+def _fma_np(data, n):
+    """
+    Fibonacci Moving Average of a 1-d ndarray
+    """
+
+    fib_list = fib_loop(n)
+    if len(fib_list) == 0:
+        # n <= 2 has no Fibonacci lookbacks to average, which sums to 0
+        return np.zeros(len(data))
+
+    emas = [_ema_np(data, fib) for fib in fib_list]
+
+    return np.nansum(emas, axis=0) / n
+
+
 # Fibonacci Moving Average
 def fma(df, column='close', n=15,
         add_col=False, return_struct='numpy'):
@@ -340,42 +430,46 @@ def fma(df, column='close', n=15,
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    fib_list = fib_loop(n)
-    ma_df = pd.DataFrame(index=df.index)
-
-    for fib in fib_list:
-        ma_df[f'{fib}'] = ema(df, n=fib)
+    fma = _fma_np(df[column].to_numpy(), n)
 
-    ma_df['sum'] = ma_df.sum(axis=1)
-    fma = (ma_df['sum'] / n).to_numpy()
-
-    if add_col == True:
+    if add_col:
         df[f'fma({n})'] = fma
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(fma,
                             columns=[f'fma({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return fma
 
 
+moving_average_funcs = {
+    'sma': sma,
+    'ema': ema,
+    'wma': wma,
+    'hma': hma,
+    'wilders': wilders_ma,
+    'kama': kama,
+    'fma': fma,
+    }
+
+
+# ndarray-in/ndarray-out versions, for chaining moving averages without
+# wrapping every intermediate result back into a DataFrame
+moving_average_np_funcs = {
+    'sma': _sma_np,
+    'ema': _ema_np,
+    'wma': _wma_np,
+    'hma': _hma_np,
+    'wilders': _wilders_np,
+    'fma': _fma_np,
+    }
+
+
 def moving_average_mapper(moving_average):
     """
     Map input strings to functions
     Returns the desired moving average function
     """
-    moving_average_funcs = {
-        'sma': sma,
-        'ema': ema,
-        'wma': wma,
-        'hma': hma,
-        'wilders': wilders_ma,
-        'kama': kama,
-        'fma': fma,
-        }
-
-    moving_average = moving_average_funcs[moving_average]
-
-    return moving_average
 
+    return moving_average_funcs[moving_average]
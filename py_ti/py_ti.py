@@ -1,8 +1,16 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 
-from moving_averages import moving_average_mapper
+from moving_averages import (moving_average_mapper, moving_average_np_funcs,
+                             _ema_seed, _ema_seeds)
 from check_errors import check_errors
+from helper_loops import (rolling_std_welford, true_range_loop, adx_loop,
+                          bands_loop, bands_loop_parallel, rolling_min_max,
+                          percent_k_loop, ultimate_osc_loop, macd_loop,
+                          ewm_step, macd_many_loop)
 
 
 sma = moving_average_mapper('sma')
@@ -51,18 +59,24 @@ def returns(df, column='close', ret_method='simple',
     check_errors(df=df, column=column, ret_method=ret_method,
                  add_col=add_col, return_struct=return_struct)
 
+    price = df[column].to_numpy()
+    returns = np.full(len(price), np.nan)
+
     if ret_method == 'simple':
-        returns = df[column].pct_change()
+        np.divide(price[1:], price[:-1], out=returns[1:])
+        returns[1:] -= 1
     elif ret_method == 'log':
-        returns = np.log(df[column] / df[column].shift(1))
+        np.log(price[1:] / price[:-1], out=returns[1:])
 
-    if add_col == True:
+    if add_col:
         df[f'{ret_method}_ret'] = returns
         return df
     elif return_struct == 'pandas':
-        return returns.to_frame(name=f'{ret_method}_ret')
+        return pd.DataFrame(returns,
+                            columns=[f'{ret_method}_ret'],
+                            index=df.index, copy=False)
     else:
-        return returns.to_numpy()
+        return returns
 
 
 def hvol(df, column='close', n=20, ret_method='simple', ddof=1,
@@ -110,17 +124,18 @@ def hvol(df, column='close', n=20, ret_method='simple', ddof=1,
                   add_col=add_col, return_struct=return_struct)
 
     rets = returns(df, column=column, ret_method=ret_method)
-    _df = pd.DataFrame(rets, columns=[column])
-    hvol = _df.rolling(window=n).std(ddof=ddof) * 252 ** 0.5
-    hvol.columns = [f'hvol({n})']
+    hvol = rolling_std_welford(rets, n, ddof)
+    hvol *= 252 ** 0.5
 
-    if add_col == True:
-        df[f'hvol({n})'] = hvol.to_numpy()
+    if add_col:
+        df[f'hvol({n})'] = hvol
         return df
     elif return_struct == 'pandas':
-        return hvol
+        return pd.DataFrame(hvol, columns=[f'hvol({n})'], index=df.index,
+                            copy=False)
     else:
-        return hvol.to_numpy()
+        # Kept as an (N, 1) column, the shape hvol has always returned
+        return hvol[:, None]
 
 
 def momentum(df, column='close', n=20, add_col=False, return_struct='numpy'):
@@ -159,15 +174,18 @@ def momentum(df, column='close', n=20, add_col=False, return_struct='numpy'):
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    mom = df[column].diff(n)
+    price = df[column].to_numpy()
+    mom = np.full(len(price), np.nan)
+    np.subtract(price[n:], price[:max(len(price) - n, 0)], out=mom[n:])
 
-    if add_col == True:
+    if add_col:
         df[f'mom({n})'] = mom
         return df
     elif return_struct == 'pandas':
-        return mom.to_frame(name=f'mom({n})')
+        return pd.DataFrame(mom, columns=[f'mom({n})'],
+                            index=df.index, copy=False)
     else:
-        return mom.to_numpy()
+        return mom
 
 
 def rate_of_change(df, column='close', n=20,
@@ -207,18 +225,31 @@ def rate_of_change(df, column='close', n=20,
     check_errors(df=df, column=column, n=n,
                  add_col=add_col, return_struct=return_struct)
 
-    roc = df[column].diff(n) / df[column].shift(n) * 100
+    price = df[column].to_numpy()
+    prev = price[:max(len(price) - n, 0)]
+    roc = np.full(len(price), np.nan)
+    roc[n:] = (price[n:] - prev) / prev * 100
 
-    if add_col == True:
+    if add_col:
         df[f'roc({n})'] = roc
         return df
     elif return_struct == 'pandas':
-        return roc.to_frame(name=f'roc({n})')
+        return pd.DataFrame(roc, columns=[f'roc({n})'],
+                            index=df.index, copy=False)
     else:
-        return roc.to_numpy()
+        return roc
+
+
+def _true_range(df):
+    """
+    Returns the true range of df's high/low/close columns as an ndarray
+    """
+
+    return true_range_loop(df['high'].to_numpy(), df['low'].to_numpy(),
+                           df['close'].to_numpy(), np.empty(len(df)))
 
 
-def true_range(df, add_col=False, return_struct='numpy'):
+def true_range(df, add_col=False, return_struct='numpy', out=None):
     """ True Range
     
     Parameters
@@ -235,6 +266,9 @@ def true_range(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    out : Numpy array, optional. The default is None
+        A preallocated float array of shape (len(df),) to write the
+        result into, so repeated calls can reuse the same buffer.
 
     Returns
     -------
@@ -247,23 +281,27 @@ def true_range(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 out=out)
 
-    hl = df['high'] - df['low']
-    hc = abs(df['high'] - df['close'].shift(1))
-    lc = abs(df['low'] - df['close'].shift(1))
-    tr = np.nanmax([hl, hc, lc], axis=0)
+    if out is None:
+        out = np.empty(len(df))
 
-    if add_col == True:
+    tr = true_range_loop(df['high'].to_numpy(), df['low'].to_numpy(),
+                         df['close'].to_numpy(), out)
+
+    if add_col:
         df['true_range'] = tr
         return df
     elif return_struct == 'pandas':
-        return pd.DataFrame(tr, columns=['true_range'], index=df.index)
+        return pd.DataFrame(tr, columns=['true_range'],
+                            index=df.index, copy=False)
     else:
         return tr
 
 
-def atr(df, n=20, ma_method='sma', add_col=False, return_struct='numpy'):
+def atr(df, n=20, ma_method='sma', add_col=False, return_struct='numpy',
+        tr_values=None):
     """ Average True Range
     
     Parameters
@@ -285,6 +323,10 @@ def atr(df, n=20, ma_method='sma', add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    tr_values : Numpy ndarray, optional. The default is None
+        The result of true_range(df), to reuse a true range computed
+        earlier instead of recomputing it. It must come from the current
+        values of df. If None, the true range is computed from df.
 
     Returns
     -------
@@ -298,27 +340,28 @@ def atr(df, n=20, ma_method='sma', add_col=False, return_struct='numpy'):
     """
 
     check_errors(df=df, n=n, ma_method=ma_method,
-                 add_col=add_col, return_struct=return_struct)
+                 add_col=add_col, return_struct=return_struct,
+                 tr_values=tr_values)
 
-    tr = true_range(df, add_col=False, return_struct='pandas')
-    tr.columns = ['close']
-    
-    _ma = moving_average_mapper(ma_method)
-    atr = _ma(tr, n=n)            
+    if tr_values is None:
+        tr_values = _true_range(df)
 
-    if add_col == True:
+    _ma = moving_average_np_funcs[ma_method]
+    atr = _ma(tr_values, n)
+
+    if add_col:
         df[f'{ma_method}_atr({n})'] = atr
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(atr,
                             columns=[f'{ma_method}_atr({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return atr
 
 
 def atr_percent(df, column='close', n=20, ma_method='sma',
-                add_col=False, return_struct='numpy'):
+                add_col=False, return_struct='numpy', tr_values=None):
     """ Average True Range Percent
     
     Parameters
@@ -343,6 +386,10 @@ def atr_percent(df, column='close', n=20, ma_method='sma',
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    tr_values : Numpy ndarray, optional. The default is None
+        The result of true_range(df), to reuse a true range computed
+        earlier instead of recomputing it. It must come from the current
+        values of df. If None, the true range is computed from df.
 
     Returns
     -------
@@ -356,23 +403,27 @@ def atr_percent(df, column='close', n=20, ma_method='sma',
     """
 
     check_errors(df=df, column=column, n=n, ma_method=ma_method,
-                 add_col=add_col, return_struct=return_struct)
+                 add_col=add_col, return_struct=return_struct,
+                 tr_values=tr_values)
 
-    _atr = atr(df, n=n, ma_method=ma_method)
-    atr_prcnt = (_atr / df[column]) * 100
+    _atr = atr(df, n=n, ma_method=ma_method, tr_values=tr_values)
+    atr_prcnt = _atr / df[column].to_numpy()
+    atr_prcnt *= 100
 
-    if add_col == True:
+    if add_col:
         df[f'atr_%({n})'] = atr_prcnt
         return df
     elif return_struct == 'pandas':
-        return atr_prcnt.to_frame(name=f'atr_%({n})')
+        return pd.DataFrame(atr_prcnt, columns=[f'atr_%({n})'],
+                            index=df.index, copy=False)
     else:
-        return atr_prcnt.to_numpy()
+        return atr_prcnt
 
     
 def keltner_channels(df, column='close', n=20, ma_method='sma',
                      upper_factor=2.0, lower_factor=2.0,
-                     add_col=False, return_struct='numpy'):
+                     add_col=False, return_struct='numpy', out=None,
+                     tr_values=None, parallel=False):
     """ Keltner Channels
     
     Parameters
@@ -400,6 +451,18 @@ def keltner_channels(df, column='close', n=20, ma_method='sma',
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    out : Numpy array, optional. The default is None
+        A preallocated float array of shape (len(df), 2) to write the
+        bands into, so repeated calls can reuse the same buffer.
+    tr_values : Numpy ndarray, optional. The default is None
+        The result of true_range(df), to reuse a true range computed
+        earlier instead of recomputing it. It must come from the current
+        values of df. If None, the true range is computed from df.
+    parallel : Boolean, optional. The default is False
+        If set to True, the bands are combined by a multi-threaded Numba
+        kernel, which only pays off on very long series. Not allowed in
+        compute_all or parallel_apply, whose worker threads would enter
+        Numba's parallel runtime at the same time.
 
     Returns
     -------
@@ -414,32 +477,36 @@ def keltner_channels(df, column='close', n=20, ma_method='sma',
     
     check_errors(df=df, column=column, n=n, ma_method=ma_method,
                  upper_factor=upper_factor, lower_factor=lower_factor,
-                 add_col=add_col, return_struct=return_struct)
+                 add_col=add_col, return_struct=return_struct,
+                 out=out, out_cols=2, tr_values=tr_values, parallel=parallel)
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
     
-    _ma = _ma_func(df, column=column, n=n)
-    _atr = atr(df, n=n, ma_method=ma_method)
+    _ma = _ma_func(df[column].to_numpy(), n)
+    _atr = atr(df, n=n, ma_method=ma_method, tr_values=tr_values)
+
+    if out is None:
+        out = np.empty((len(df), 2), order='F')
 
-    keltner_upper = _ma + (_atr * upper_factor)
-    keltner_lower = _ma - (_atr * lower_factor)
-    keltner = np.vstack((keltner_lower, keltner_upper)).transpose()
+    _bands_loop = bands_loop_parallel if parallel else bands_loop
+    keltner = _bands_loop(_ma, _atr, upper_factor, lower_factor, out)
 
-    if add_col == True:
-        df[f'kelt({n})_lower'] = keltner_lower
-        df[f'kelt({n})_upper'] = keltner_upper
+    if add_col:
+        df[f'kelt({n})_lower'] = keltner[:, 0]
+        df[f'kelt({n})_upper'] = keltner[:, 1]
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(keltner,
                             columns=[f'kelt({n})_lower', f'kelt({n})_upper'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return keltner
 
 
 def bollinger_bands(df, column='close', n=20, ma_method='sma', ddof=1,
                     upper_num_sd=2.0, lower_num_sd=2.0,
-                    add_col=False, return_struct='numpy'):
+                    add_col=False, return_struct='numpy', out=None,
+                    parallel=False):
     """ Bollinger Bands
     
     Parameters
@@ -473,6 +540,14 @@ def bollinger_bands(df, column='close', n=20, ma_method='sma', ddof=1,
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    out : Numpy array, optional. The default is None
+        A preallocated float array of shape (len(df), 2) to write the
+        bands into, so repeated calls can reuse the same buffer.
+    parallel : Boolean, optional. The default is False
+        If set to True, the bands are combined by a multi-threaded Numba
+        kernel, which only pays off on very long series. Not allowed in
+        compute_all or parallel_apply, whose worker threads would enter
+        Numba's parallel runtime at the same time.
 
     Returns
     -------
@@ -487,24 +562,29 @@ def bollinger_bands(df, column='close', n=20, ma_method='sma', ddof=1,
  
     check_errors(df=df, column=column, n=n, ma_method=ma_method,
                   upper_num_sd=upper_num_sd, lower_num_sd=lower_num_sd,
-                  add_col=add_col, return_struct=return_struct)
+                  add_col=add_col, return_struct=return_struct,
+                  out=out, out_cols=2, parallel=parallel)
+
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    _ma_func = moving_average_mapper(ma_method)
+    price = df[column].to_numpy()
+    price_std = rolling_std_welford(price, n, ddof)
+    mid_bb = _ma_func(price, n)
+    if out is None:
+        out = np.empty((len(df), 2), order='F')
 
-    price_std = (df[column].rolling(window=n).std(ddof=ddof)).to_numpy()
-    mid_bb = _ma_func(df, column=column, n=n)
-    lower_bb = mid_bb - (price_std * lower_num_sd)
-    upper_bb = mid_bb + (price_std * upper_num_sd)
-    bollinger = np.vstack((lower_bb, upper_bb)).transpose()
+    _bands_loop = bands_loop_parallel if parallel else bands_loop
+    bollinger = _bands_loop(mid_bb, price_std, upper_num_sd, lower_num_sd,
+                            out)
 
-    if add_col == True:
-        df[f'bb({n})_lower'] = lower_bb
-        df[f'bb({n})_upper'] = upper_bb
+    if add_col:
+        df[f'bb({n})_lower'] = bollinger[:, 0]
+        df[f'bb({n})_upper'] = bollinger[:, 1]
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(bollinger,
                             columns=[f'bb({n})_lower', f'bb({n})_upper'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return bollinger
 
@@ -552,23 +632,31 @@ def rsi(df, column='close', n=14, ma_method='sma',
     check_errors(df=df, column=column, n=n, ma_method=ma_method,
                   add_col=add_col, return_struct=return_struct)
 
-    change = pd.DataFrame(df[column].diff()).fillna(0)
-    up, dn = change.copy(), change.copy()
-    up[up < 0] = 0
-    dn[dn > 0] = 0
+    price = df[column].to_numpy()
+    change = np.empty(len(price))
+    change[:1] = 0
+    np.subtract(price[1:], price[:-1], out=change[1:])
+
+    # fmax/fmin map NaN changes to 0, same as fillna(0)
+    up = np.fmax(change, 0.0)
+    dn = -np.fmin(change, 0.0)
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    avg_up = _ma_func(up, column=column, n=n)
-    avg_dn = -_ma_func(dn, column=column, n=n)
+    avg_up = _ma_func(up, n)
+    avg_dn = _ma_func(dn, n)
 
-    rsi = np.where(avg_dn == 0.0, 100, 100.0 - 100.0 / (1 + avg_up / avg_dn))
+    rsi = np.full(len(df), 100.0)
+    mask = avg_dn != 0.0
+    rs = np.divide(avg_up, avg_dn, out=np.zeros(len(df)), where=mask)
+    np.subtract(100.0, 100.0 / (1.0 + rs), out=rsi, where=mask)
 
-    if add_col == True:
+    if add_col:
         df[f'rsi({n})'] = rsi
         return df
     elif return_struct == 'pandas':
-        return pd.DataFrame(rsi, columns=[f'rsi({n})'], index=df.index)
+        return pd.DataFrame(rsi, columns=[f'rsi({n})'],
+                            index=df.index, copy=False)
     else:
         return rsi
 
@@ -620,33 +708,28 @@ def tsi(df, column='close', n=1, slow=25, fast=13, sig=7,
                   sig=sig, ma_method=ma_method,
                   add_col=add_col, return_struct=return_struct)
 
-    mom = momentum(df, column=column, n=n, return_struct='pandas')
-    abs_mom = abs(mom)
-
-    _ma_func = moving_average_mapper(ma_method)
+    price = df[column].to_numpy()
+    mom = np.full(len(price), np.nan)
+    np.subtract(price[n:], price[:max(len(price) - n, 0)], out=mom[n:])
 
-    _slow = _ma_func(mom, column=f'mom({n})',
-                     n=slow, return_struct='pandas')
-    _abs_slow = _ma_func(abs_mom, column=f'mom({n})',
-                         n=slow, return_struct='pandas')
-    _fast = _ma_func(_slow, column=f'{ma_method}({slow})',
-                     n=fast, return_struct='pandas')
-    _abs_fast = _ma_func(_abs_slow, column=f'{ma_method}({slow})',
-                         n=fast, return_struct='pandas')
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    tsi = _fast / _abs_fast * 100
-    signal = _ma_func(tsi, column=f'{ma_method}({fast})', n=sig)
+    _fast = _ma_func(_ma_func(mom, slow), fast)
+    _abs_fast = _ma_func(_ma_func(np.abs(mom), slow), fast)
 
-    tsi_signal = np.vstack((tsi[f'{ma_method}({fast})'], signal)).transpose()
+    tsi_signal = np.empty((len(df), 2), order='F')
+    np.divide(_fast, _abs_fast, out=tsi_signal[:, 0])
+    tsi_signal[:, 0] *= 100
+    tsi_signal[:, 1] = _ma_func(tsi_signal[:, 0], sig)
 
-    if add_col == True:
+    if add_col:
         df[f'tsi({slow},{fast},{sig})'] = tsi_signal[:, 0]
         df['tsi_signal'] = tsi_signal[:, 1]
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(tsi_signal,
                             columns=[f'tsi({slow},{fast},{sig})', 'tsi_signal'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return tsi_signal
 
@@ -692,29 +775,44 @@ def adx(df, column='close', n=20, ma_method='sma',
     check_errors(df=df, column=column, n=n, ma_method=ma_method,
                   add_col=add_col, return_struct=return_struct)
 
-    _atr = atr(df, n=n, ma_method=ma_method)
-
-    up = (df['high'] - df['high'].shift(1)).fillna(0)
-    dn = (df['low'].shift(1) - df['low']).fillna(0)
-    up[up < 0] = 0
-    dn[dn < 0] = 0
-    pos = pd.DataFrame(((up > dn) & (up > 0)) * up, columns=[column])
-    neg = pd.DataFrame(((dn > up) & (dn > 0)) * dn, columns=[column])
-
-    dm_pos = pos[column].rolling(n).sum()
-    dm_neg = neg[column].rolling(n).sum()
-    di_pos = 100 * (dm_pos / _atr)
-    di_neg = 100 * (dm_neg / _atr)
-    di_diff = abs(di_pos - di_neg)
-    di_sum = di_pos + di_neg
-    dx = pd.DataFrame(100 * (di_diff / di_sum), columns=[column]).fillna(0)
-
-    _ma_func = moving_average_mapper(ma_method)
-    _adx = _ma_func(dx, column=column, n=n)
-
-    adx = np.vstack((_adx, di_pos, di_neg)).transpose()
-
-    if add_col == True:
+    if ma_method in ('sma', 'wilders'):
+        # Single pass over the data, no intermediate ATR/DM series
+        _adx, di_pos, di_neg = adx_loop(df['high'].to_numpy(),
+                                        df['low'].to_numpy(),
+                                        df['close'].to_numpy(),
+                                        n, ma_method == 'wilders')
+    else:
+        _atr = atr(df, n=n, ma_method=ma_method)
+
+        high = df['high'].to_numpy()
+        low = df['low'].to_numpy()
+        up = np.zeros(len(df))
+        dn = np.zeros(len(df))
+        np.subtract(high[1:], high[:-1], out=up[1:])
+        np.subtract(low[:-1], low[1:], out=dn[1:])
+        np.fmax(up, 0.0, out=up)  # also maps NaN to 0
+        np.fmax(dn, 0.0, out=dn)
+        pos = np.where((up > dn) & (up > 0), up, 0.0)
+        neg = np.where((dn > up) & (dn > 0), dn, 0.0)
+
+        dm_pos = pd.Series(pos).rolling(n).sum().to_numpy(copy=False)
+        dm_neg = pd.Series(neg).rolling(n).sum().to_numpy(copy=False)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            di_pos = 100 * (dm_pos / _atr)
+            di_neg = 100 * (dm_neg / _atr)
+            dx = 100 * (np.abs(di_pos - di_neg) / (di_pos + di_neg))
+        dx = np.where(np.isnan(dx), 0.0, dx)
+
+        _ma_func = moving_average_np_funcs[ma_method]
+        _adx = _ma_func(dx, n)
+
+    adx = np.empty((len(df), 3), order='F')
+    adx[:, 0] = _adx
+    adx[:, 1] = di_pos
+    adx[:, 2] = di_neg
+
+    if add_col:
         df[f'adx({n})'] = adx[:, 0]
         df['DI+'] = adx[:, 1]
         df['DI-'] = adx[:, 2]
@@ -722,7 +820,7 @@ def adx(df, column='close', n=20, ma_method='sma',
     elif return_struct == 'pandas':
         return pd.DataFrame(adx,
                             columns=[f'adx({n})', 'di+', 'di-'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return adx
 
@@ -766,25 +864,25 @@ def parabolic_sar(df, af_step=0.02, max_af=0.2,
     check_errors(df=df, af_step=af_step, max_af=max_af,
                   add_col=add_col, return_struct=return_struct)
 
-    _psar = df['close'].copy().to_numpy()
-    high = df['high'].copy().to_numpy()
-    low = df['low'].copy().to_numpy()
+    _psar = df['close'].to_numpy(dtype=np.float64, copy=True)
+    high = np.ascontiguousarray(df['high'].to_numpy(), dtype=np.float64)
+    low = np.ascontiguousarray(df['low'].to_numpy(), dtype=np.float64)
 
     psar = psar_loop(_psar, high, low, af_step, max_af)
 
-    if add_col == True:
+    if add_col:
         df['psar'] = psar
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(psar,
                             columns=['psar'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return psar
 
 
 def supertrend(df, column='close', n=20, ma_method='sma', factor=2.0,
-                add_col=False, return_struct='numpy'):
+                add_col=False, return_struct='numpy', atr_values=None):
     """ Supertrend
     
     Parameters
@@ -812,6 +910,10 @@ def supertrend(df, column='close', n=20, ma_method='sma', factor=2.0,
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    atr_values : Numpy ndarray, optional. The default is None
+        The result of atr(df, n=n, ma_method=ma_method), to reuse one ATR
+        across calls that only change factor. It must come from the
+        current values of df. If None, the ATR is computed from df.
 
     Returns
     -------
@@ -827,27 +929,31 @@ def supertrend(df, column='close', n=20, ma_method='sma', factor=2.0,
     from helper_loops import supertrend_loop
             
     check_errors(df=df, column=column, n=n, ma_method=ma_method,
-                  factor=factor, add_col=add_col, return_struct=return_struct)
+                  factor=factor, add_col=add_col, return_struct=return_struct,
+                  atr_values=atr_values)
 
-    _atr = atr(df, n=n, ma_method=ma_method)
+    _atr = atr_values
+    if _atr is None:
+        _atr = atr(df, n=n, ma_method=ma_method)
     hl_avg = (df['high'] + df['low']) / 2
-    close = df[column].to_numpy()
-    basic_ub = (hl_avg + factor * _atr).to_numpy()
-    basic_lb = (hl_avg - factor * _atr).to_numpy()
+    close = np.ascontiguousarray(df[column].to_numpy(), dtype=np.float64)
+    basic_ub = (hl_avg + factor * _atr).to_numpy(copy=False)
+    basic_lb = (hl_avg - factor * _atr).to_numpy(copy=False)
     supertrend = supertrend_loop(close, basic_ub, basic_lb, n)
 
-    if add_col == True:
+    if add_col:
         df[f'supertrend({n})'] = supertrend
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(supertrend,
                             columns=[f'supertrend({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return supertrend
 
 
-def acc_dist(df, add_col=False, return_struct='numpy'):
+def acc_dist(df, add_col=False, return_struct='numpy',
+             dtype=np.float64):
     """ Accumulation/Distribution
     
     Parameters
@@ -864,6 +970,10 @@ def acc_dist(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -876,22 +986,33 @@ def acc_dist(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
-
-    clv = ((2 * df['close'] - df['high'] - df['low']) /
-            (df['high'] - df['low']) * df['volume'])
-    ad = clv.cumsum()
-
-    if add_col == True:
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
+
+    high = df['high'].to_numpy(dtype=dtype)
+    low = df['low'].to_numpy(dtype=dtype)
+    hl_range = high - low
+    clv = 2 * df['close'].to_numpy(dtype=dtype)
+    clv -= high
+    clv -= low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        clv /= hl_range
+    clv *= df['volume'].to_numpy(dtype=dtype)
+    ad = np.nancumsum(clv)
+    ad[np.isnan(clv)] = np.nan
+
+    if add_col:
         df['acc_dist'] = ad
         return df
     elif return_struct == 'pandas':
-        return ad.to_frame(name='acc_dist')
+        return pd.DataFrame(ad, columns=['acc_dist'], index=df.index,
+                            copy=False)
     else:
-        return ad.to_numpy()
+        return ad
 
 
-def obv(df, add_col=False, return_struct='numpy'):
+def obv(df, add_col=False, return_struct='numpy',
+        dtype=np.float64):
     """ On-Balance Volume
     
     Parameters
@@ -908,6 +1029,10 @@ def obv(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -920,22 +1045,41 @@ def obv(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
 
-    _mask = df['close'].mask(df['close'] >= df['close'].shift(1), other = 1)
-    mask = _mask.where(_mask == 1, other = -1)
-    obv = (df['volume'] * mask).cumsum()
+    close = df['close'].to_numpy()
+    signed_vol = np.full(len(close), -1.0, dtype=dtype)
+    signed_vol[1:][close[1:] >= close[:-1]] = 1.0
+    signed_vol *= df['volume'].to_numpy(dtype=dtype)
+    obv = np.nancumsum(signed_vol)
+    obv[np.isnan(signed_vol)] = np.nan
 
-    if add_col == True:
+    if add_col:
         df['obv'] = obv
         return df
     elif return_struct == 'pandas':
-        return obv.to_frame(name='obv')
+        return pd.DataFrame(obv, columns=['obv'], index=df.index, copy=False)
     else:
-        return obv.to_numpy()
+        return obv
+
+
+def _prev_bar(df, column, dtype=np.float64):
+    """
+    Returns df[column] shifted forward by one bar as a float array, with
+    NaN in the first row, matching df[column].shift(1)
+    """
+
+    values = df[column].to_numpy()
+    prev = np.empty(len(values), dtype=dtype)
+    prev[:1] = np.nan
+    prev[1:] = values[:-1]
 
+    return prev
 
-def trad_pivots(df, add_col=False, return_struct='numpy'):
+
+def trad_pivots(df, add_col=False, return_struct='numpy',
+                dtype=np.float64):
     """ Traditional Pivot Points
     
     Parameters
@@ -952,6 +1096,10 @@ def trad_pivots(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -964,38 +1112,38 @@ def trad_pivots(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
-
-    _df = df.shift(1, axis=0)  # Use yesterday's HLC
-
-    pp = (_df['high'] + _df['low'] + _df['close']) / 3
-    r1 = 2 * pp - _df['low']
-    s1 = 2 * pp - _df['high']
-    r2 = pp + _df['high'] - _df['low']
-    s2 = pp - _df['high'] - _df['low']
-    r3 = 2 * pp + (_df['high'] - 2 * _df['low'])
-    s3 = 2 * pp - (_df['high'] * 2 - _df['low'])
-
-    pps = np.vstack((s3, s2, s1, pp, r1, r2, r3)).transpose()
-
-    if add_col == True:
-        df['s3'] = pps[:, 0]
-        df['s2'] = pps[:, 1]
-        df['s1'] = pps[:, 2]
-        df['pp'] = pps[:, 3]
-        df['r1'] = pps[:, 4]
-        df['r2'] = pps[:, 5]
-        df['r3'] = pps[:, 6]
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
+
+    high = _prev_bar(df, 'high', dtype)  # Use yesterday's HLC
+    low = _prev_bar(df, 'low', dtype)
+    close = _prev_bar(df, 'close', dtype)
+
+    pps = np.empty((len(df), 7), dtype=dtype, order='F')
+    pp = pps[:, 3]
+    np.add(high, low, out=pp)
+    pp += close
+    pp /= 3
+    pps[:, 4] = 2 * pp - low
+    pps[:, 2] = 2 * pp - high
+    pps[:, 5] = pp + high - low
+    pps[:, 1] = pp - high - low
+    pps[:, 6] = 2 * pp + (high - 2 * low)
+    pps[:, 0] = 2 * pp - (high * 2 - low)
+
+    if add_col:
+        df[['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3']] = pps
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(pps,
                             columns=['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return pps
 
 
-def classic_pivots(df, add_col=False, return_struct='numpy'):
+def classic_pivots(df, add_col=False, return_struct='numpy',
+                   dtype=np.float64):
     """ Classic Pivot Points
     
     Parameters
@@ -1012,6 +1160,10 @@ def classic_pivots(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -1024,38 +1176,39 @@ def classic_pivots(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
-
-    _df = df.shift(1, axis=0)  # Use yesterday's HLC
-
-    pp = (_df['high'] + _df['low'] + _df['close']) / 3
-    r1 = 2 * pp - _df['low']
-    s1 = 2 * pp - _df['high']
-    r2 = pp + _df['high'] - _df['low']
-    s2 = pp - _df['high'] - _df['low']
-    r3 = pp + 2 * (_df['high'] - _df['low'])
-    s3 = pp - 2 * (_df['high'] - _df['low'])
-
-    pps = np.vstack((s3, s2, s1, pp, r1, r2, r3)).transpose()
-
-    if add_col == True:
-        df['s3'] = pps[:, 0]
-        df['s2'] = pps[:, 1]
-        df['s1'] = pps[:, 2]
-        df['pp'] = pps[:, 3]
-        df['r1'] = pps[:, 4]
-        df['r2'] = pps[:, 5]
-        df['r3'] = pps[:, 6]
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
+
+    high = _prev_bar(df, 'high', dtype)  # Use yesterday's HLC
+    low = _prev_bar(df, 'low', dtype)
+    close = _prev_bar(df, 'close', dtype)
+    hl_range = high - low
+
+    pps = np.empty((len(df), 7), dtype=dtype, order='F')
+    pp = pps[:, 3]
+    np.add(high, low, out=pp)
+    pp += close
+    pp /= 3
+    pps[:, 4] = 2 * pp - low
+    pps[:, 2] = 2 * pp - high
+    pps[:, 5] = pp + high - low
+    pps[:, 1] = pp - high - low
+    pps[:, 6] = pp + 2 * hl_range
+    pps[:, 0] = pp - 2 * hl_range
+
+    if add_col:
+        df[['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3']] = pps
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(pps,
                             columns=['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return pps
 
 
-def fibonacci_pivots(df, add_col=False, return_struct='numpy'):
+def fibonacci_pivots(df, add_col=False, return_struct='numpy',
+                     dtype=np.float64):
     """ Fibonacci Pivot Points
     
     Parameters
@@ -1072,6 +1225,10 @@ def fibonacci_pivots(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -1084,38 +1241,39 @@ def fibonacci_pivots(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
-
-    _df = df.shift(1, axis=0)  # Use yesterday's HLC
-
-    pp = (_df['high'] + _df['low'] + _df['close']) / 3
-    r1 = pp + 0.382 * (_df['high'] - _df['low'])
-    s1 = pp - 0.382 * (_df['high'] - _df['low'])
-    r2 = pp + 0.618 * (_df['high'] - _df['low'])
-    s2 = pp - 0.618 * (_df['high'] - _df['low'])
-    r3 = pp + (_df['high'] - _df['low'])
-    s3 = pp - (_df['high'] - _df['low'])
-
-    pps = np.vstack((s3, s2, s1, pp, r1, r2, r3)).transpose()
-
-    if add_col == True:
-        df['s3'] = pps[:, 0]
-        df['s2'] = pps[:, 1]
-        df['s1'] = pps[:, 2]
-        df['pp'] = pps[:, 3]
-        df['r1'] = pps[:, 4]
-        df['r2'] = pps[:, 5]
-        df['r3'] = pps[:, 6]
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
+
+    high = _prev_bar(df, 'high', dtype)  # Use yesterday's HLC
+    low = _prev_bar(df, 'low', dtype)
+    close = _prev_bar(df, 'close', dtype)
+    hl_range = high - low
+
+    pps = np.empty((len(df), 7), dtype=dtype, order='F')
+    pp = pps[:, 3]
+    np.add(high, low, out=pp)
+    pp += close
+    pp /= 3
+    pps[:, 4] = pp + 0.382 * hl_range
+    pps[:, 2] = pp - 0.382 * hl_range
+    pps[:, 5] = pp + 0.618 * hl_range
+    pps[:, 1] = pp - 0.618 * hl_range
+    np.add(pp, hl_range, out=pps[:, 6])
+    np.subtract(pp, hl_range, out=pps[:, 0])
+
+    if add_col:
+        df[['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3']] = pps
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(pps,
                             columns=['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return pps
 
 
-def woodie_pivots(df, add_col=False, return_struct='numpy'):
+def woodie_pivots(df, add_col=False, return_struct='numpy',
+                  dtype=np.float64):
     """ Woodie Pivot Points
     
     Parameters
@@ -1132,6 +1290,10 @@ def woodie_pivots(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -1144,40 +1306,38 @@ def woodie_pivots(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
-
-    _df = df.copy()  # Use today's open and yesterday's HL
-    _df['prev_high'] = df['high'].shift(1)
-    _df['prev_low'] = df['low'].shift(1)
-
-    pp = (_df['prev_high'] + _df['prev_low'] + 2 * _df['open']) / 4
-    r1 = pp * 2 - _df['prev_low']
-    s1 = pp * 2 - _df['prev_high']
-    r2 = pp + (_df['prev_high'] - _df['prev_low'])
-    s2 = pp - (_df['prev_high'] - _df['prev_low'])
-    r3 = _df['prev_high'] + 2 * (pp - _df['prev_low'])
-    s3 = _df['prev_low'] - 2 * (_df['prev_high'] - pp)
-
-    pps = np.vstack((s3, s2, s1, pp, r1, r2, r3)).transpose()
-
-    if add_col == True:
-        df['s3'] = pps[:, 0]
-        df['s2'] = pps[:, 1]
-        df['s1'] = pps[:, 2]
-        df['pp'] = pps[:, 3]
-        df['r1'] = pps[:, 4]
-        df['r2'] = pps[:, 5]
-        df['r3'] = pps[:, 6]
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
+
+    prev_high = _prev_bar(df, 'high', dtype)  # Use today's open and yesterday's HL
+    prev_low = _prev_bar(df, 'low', dtype)
+    hl_range = prev_high - prev_low
+
+    pps = np.empty((len(df), 7), dtype=dtype, order='F')
+    pp = pps[:, 3]
+    np.add(prev_high, prev_low, out=pp)
+    pp += 2 * df['open'].to_numpy(dtype=dtype)
+    pp /= 4
+    pps[:, 4] = pp * 2 - prev_low
+    pps[:, 2] = pp * 2 - prev_high
+    np.add(pp, hl_range, out=pps[:, 5])
+    np.subtract(pp, hl_range, out=pps[:, 1])
+    pps[:, 6] = prev_high + 2 * (pp - prev_low)
+    pps[:, 0] = prev_low - 2 * (prev_high - pp)
+
+    if add_col:
+        df[['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3']] = pps
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(pps,
                             columns=['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return pps
 
 
-def demark_pivots(df, add_col=False, return_struct='numpy'):
+def demark_pivots(df, add_col=False, return_struct='numpy',
+                  dtype=np.float64):
     """ Demark Pivot Points
     
     Parameters
@@ -1194,6 +1354,10 @@ def demark_pivots(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -1206,38 +1370,37 @@ def demark_pivots(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
 
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
-
-    _df = df.shift(1, axis=0)  # Use yesterday's HLC
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
 
-    if _df['open'] == _df['close']:
-        num = 2 * _df['close'] + _df['high'] + _df['low']
-    elif _df['close'] > _df['open']:
-        num = 2 * _df['high'] + _df['low'] + _df['close']
-    else:
-        num = 2 * _df['low'] + _df['high'] + _df['close']
+    _open = _prev_bar(df, 'open', dtype)  # Use yesterday's OHLC
+    high = _prev_bar(df, 'high', dtype)
+    low = _prev_bar(df, 'low', dtype)
+    close = _prev_bar(df, 'close', dtype)
 
-    pp = num / 4
-    r1 = num / 2 - _df['low']
-    s1 = num / 2 - _df['high']
+    num = np.select([_open == close, close > _open],
+                    [2 * close + high + low, 2 * high + low + close],
+                    default=2 * low + high + close)
 
-    pps = np.vstack((s1, pp, r1)).transpose()
+    pps = np.empty((len(df), 3), dtype=dtype, order='F')
+    np.divide(num, 4, out=pps[:, 1])
+    pps[:, 2] = num / 2 - low
+    pps[:, 0] = num / 2 - high
 
-    if add_col == True:
-        df['s1'] = pps[:, 0]
-        df['pp'] = pps[:, 1]
-        df['r1'] = pps[:, 2]
+    if add_col:
+        df[['s1', 'pp', 'r1']] = pps
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(pps,
                             columns=['s1', 'pp', 'r1'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return pps
 
 
 # Camarilla Pivots
-def camarilla_pivots(df, add_col=False, return_struct='numpy'):
+def camarilla_pivots(df, add_col=False, return_struct='numpy',
+                     dtype=np.float64):
     """ Camarilla Pivot Points
     
     Parameters
@@ -1254,6 +1417,10 @@ def camarilla_pivots(df, add_col=False, return_struct='numpy'):
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the inputs and the result at the cost of
+        precision, which matters most for long running totals.
 
     Returns
     -------
@@ -1266,37 +1433,62 @@ def camarilla_pivots(df, add_col=False, return_struct='numpy'):
     return_struct parameter.
     """
             
-    check_errors(df=df, add_col=add_col, return_struct=return_struct)
-
-    _df = df.shift(1, axis=0)  # Use yesterday's HLC
-
-    pp = (_df['high'] + _df['low'] + _df['close']) / 3
-    r1 = _df['close'] + 1.1 * (_df['high'] - _df['low']) / 12
-    s1 = _df['close'] - 1.1 * (_df['high'] - _df['low']) / 12
-    r2 = _df['close'] + 1.1 * (_df['high'] - _df['low']) / 6
-    s2 = _df['close'] - 1.1 * (_df['high'] - _df['low']) / 6
-    r3 = _df['close'] + 1.1 * (_df['high'] - _df['low']) / 4
-    s3 = _df['close'] - 1.1 * (_df['high'] - _df['low']) / 4
-
-    pps = np.vstack((s3, s2, s1, pp, r1, r2, r3)).transpose()
-
-    if add_col == True:
-        df['s3'] = pps[:, 0]
-        df['s2'] = pps[:, 1]
-        df['s1'] = pps[:, 2]
-        df['pp'] = pps[:, 3]
-        df['r1'] = pps[:, 4]
-        df['r2'] = pps[:, 5]
-        df['r3'] = pps[:, 6]
+    check_errors(df=df, add_col=add_col, return_struct=return_struct,
+                 dtype=dtype)
+
+    high = _prev_bar(df, 'high', dtype)  # Use yesterday's HLC
+    low = _prev_bar(df, 'low', dtype)
+    close = _prev_bar(df, 'close', dtype)
+    hl_range = 1.1 * (high - low)
+
+    pps = np.empty((len(df), 7), dtype=dtype, order='F')
+    pp = pps[:, 3]
+    np.add(high, low, out=pp)
+    pp += close
+    pp /= 3
+    pps[:, 4] = close + hl_range / 12
+    pps[:, 2] = close - hl_range / 12
+    pps[:, 5] = close + hl_range / 6
+    pps[:, 1] = close - hl_range / 6
+    pps[:, 6] = close + hl_range / 4
+    pps[:, 0] = close - hl_range / 4
+
+    if add_col:
+        df[['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3']] = pps
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(pps,
                             columns=['s3', 's2', 's1', 'pp', 'r1', 'r2', 'r3'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return pps
 
 
+def _rolling_low_high(df, n):
+    """
+    Returns the rolling n-bar minimum of df['low'] and maximum of
+    df['high'] as float arrays, computed in a single pass
+    """
+
+    low = np.ascontiguousarray(df['low'].to_numpy(), dtype=np.float64)
+    high = np.ascontiguousarray(df['high'].to_numpy(), dtype=np.float64)
+
+    return rolling_min_max(low, high, n)
+
+
+def _percent_k(df, n):
+    """
+    Returns the stochastic %K of df['close'] against the rolling n-bar
+    low/high range as a float array
+    """
+
+    close = np.ascontiguousarray(df['close'].to_numpy(), dtype=np.float64)
+    low = np.ascontiguousarray(df['low'].to_numpy(), dtype=np.float64)
+    high = np.ascontiguousarray(df['high'].to_numpy(), dtype=np.float64)
+
+    return percent_k_loop(close, low, high, n)
+
+
 # Full Stochastic Oscillator
 def stochastic(df, n_k=14, n_d=3, n_slow=1, ma_method='sma',
                add_col=False, return_struct='numpy'):
@@ -1343,28 +1535,20 @@ def stochastic(df, n_k=14, n_d=3, n_slow=1, ma_method='sma',
     check_errors(df=df, n_k=n_k, n_d=n_d, n_slow=n_slow, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    low = df['low'].rolling(n_k).min()
-    high = df['high'].rolling(n_k).max()
-    percent_k = ((df['close'] - low) / (high - low) * 100).to_frame(name='%k')
-
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    full_k = _ma_func(percent_k, column='%k', n=n_slow,
-                      return_struct='pandas')
-    full_d = _ma_func(full_k, column=f'{ma_method}({n_slow})', n=n_d,
-                      return_struct='pandas')
+    full_stoch = np.empty((len(df), 2), order='F')
+    full_stoch[:, 0] = _ma_func(_percent_k(df, n_k), n_slow)
+    full_stoch[:, 1] = _ma_func(full_stoch[:, 0], n_d)
 
-    full_stoch = np.vstack((full_k[f'{ma_method}({n_slow})'],
-                            full_d[f'{ma_method}({n_d})'])).transpose()
-
-    if add_col == True:
-        df[f'%k({n_k},{n_slow})'] = full_k
-        df[f'%d({n_d})'] = full_d
+    if add_col:
+        df[f'%k({n_k},{n_slow})'] = full_stoch[:, 0]
+        df[f'%d({n_d})'] = full_stoch[:, 1]
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(full_stoch,
                             columns=[f'%k({n_k},{n_slow})', f'%d({n_d})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return full_stoch
     
@@ -1415,32 +1599,24 @@ def stochastic_rsi(df, n_k=14, n_d=3, n_slow=1, ma_method='sma',
     check_errors(df=df, n_k=n_k, n_d=n_d, n_slow=n_slow, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    rsi_df = rsi(df, n=n_k, ma_method=ma_method, return_struct='pandas')
-
-    low = rsi_df[f'rsi({n_k})'].rolling(n_k).min()
-    high = rsi_df[f'rsi({n_k})'].rolling(n_k).max()
-    percent_k = ((rsi_df[f'rsi({n_k})'] - low) /
-                 (high - low) * 100).to_frame(name='%k')
-
-    _ma_func = moving_average_mapper(ma_method)
+    _rsi = np.ascontiguousarray(rsi(df, n=n_k, ma_method=ma_method),
+                                dtype=np.float64)
 
-    full_k = _ma_func(percent_k, column='%k', n=n_slow,
-                      return_struct='pandas')
-    full_d = _ma_func(full_k, column=f'{ma_method}({n_slow})', n=n_d,
-                      return_struct='pandas')
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    stoch_rsi = np.vstack((full_k[f'{ma_method}({n_slow})'],
-                           full_d[f'{ma_method}({n_d})'])).transpose()
+    stoch_rsi = np.empty((len(df), 2), order='F')
+    stoch_rsi[:, 0] = _ma_func(percent_k_loop(_rsi, _rsi, _rsi, n_k), n_slow)
+    stoch_rsi[:, 1] = _ma_func(stoch_rsi[:, 0], n_d)
 
-    if add_col == True:
-            df[f'stoch_RSI %k({n_k},{n_slow})'] = full_k
-            df[f'stoch_RSI %d({n_d})'] = full_d
-            return df
+    if add_col:
+        df[f'stoch_RSI %k({n_k},{n_slow})'] = stoch_rsi[:, 0]
+        df[f'stoch_RSI %d({n_d})'] = stoch_rsi[:, 1]
+        return df
     elif return_struct == 'pandas':
         return pd.DataFrame(stoch_rsi,
                             columns=[f'stoch_RSI %k({n_k},{n_slow})',
                                      f'stoch_RSI %d({n_d})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return stoch_rsi
       
@@ -1484,19 +1660,18 @@ def rsi_stochastic(df, n=14, ma_method='sma',
     check_errors(df=df, n=n, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    low = df['low'].rolling(n).min()
-    high = df['high'].rolling(n).max()
-    percent_k = ((df['close'] - low) / (high - low) * 100).to_frame(name='%k')
+    percent_k = pd.DataFrame(_percent_k(df, n), columns=['%k'],
+                             index=df.index, copy=False)
 
     rsi_stoch = rsi(percent_k, column='%k', n=n, ma_method=ma_method)
 
-    if add_col == True:
+    if add_col:
         df[f'RSI_stoch({n})'] = rsi_stoch
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(rsi_stoch,
                             columns=[f'RSI_stoch({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return rsi_stoch
 
@@ -1541,26 +1716,18 @@ def ultimate_oscillator(df, n_fast=7, n_med=14, n_slow=28,
     check_errors(df=df, n_fast=n_fast, n_med=n_med, n_slow=n_slow,
                  add_col=add_col, return_struct=return_struct)
 
-    df['prev_clo'] = df['close'].shift(1)
-    bp = df['close'] - (df[['low','prev_clo']].min(axis=1))
-    tr = true_range(df, return_struct='pandas')
-
-    first_ma = (bp.rolling(n_fast).sum() /
-                tr['true_range'].rolling(n_fast).sum())
-    second_ma = (bp.rolling(n_med).sum() /
-                 tr['true_range'].rolling(n_med).sum())
-    third_ma = (bp.rolling(n_slow).sum() /
-                tr['true_range'].rolling(n_slow).sum())
-
-    ult_osc = ((first_ma * 4 + second_ma * 2 + third_ma) / 7 * 100).to_numpy()
+    bp = df['close'].to_numpy() - np.fmin(df['low'].to_numpy(),
+                                          _prev_bar(df, 'close'))
+    ult_osc = ultimate_osc_loop(bp, _true_range(df),
+                                n_fast, n_med, n_slow)
 
-    if add_col == True:
+    if add_col:
         df[f'ultimate_oscillator({n_fast},{n_med},{n_slow})'] = ult_osc
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(ult_osc,
                             columns=[f'ultimate_oscillator({n_fast},{n_med},{n_slow})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return ult_osc
 
@@ -1609,23 +1776,20 @@ def trix(df, column='close', n=9, sig=3, ma_method='ema',
     check_errors(df=df, column=column, n=n, sig=sig, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    ma_1 = _ma_func(df, column=column, n=n,
-                    return_struct='pandas')
-    ma_2 = _ma_func(ma_1, column=f'{ma_method}({n})', n=n,
-                    return_struct='pandas')
-    ma_3 = _ma_func(ma_2, column=f'{ma_method}({n})', n=n,
-                    return_struct='pandas')
+    ma_3 = _ma_func(_ma_func(_ma_func(df[column].to_numpy(), n), n), n)
 
-    ma_3['prev'] = ma_3[f'{ma_method}({n})'].shift(1)
-    trix = ((ma_3[f'{ma_method}({n})'] /
-             ma_3['prev'] - 1) * 10000).to_frame(name='close')
-    trix['signal'] = _ma_func(trix, n=sig)
+    trix = np.empty((len(df), 2), order='F')
+    _trix = trix[:, 0]
+    _trix[:1] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(ma_3[1:], ma_3[:-1], out=_trix[1:])
+    _trix -= 1
+    _trix *= 10000
+    trix[:, 1] = _ma_func(_trix, sig)
 
-    trix = trix.to_numpy()
-
-    if add_col == True:
+    if add_col:
         df[f'trix_({n})'] = trix[:, 0]
         df[f'trix_signal({sig})'] = trix[:, 1]
         return df
@@ -1633,14 +1797,14 @@ def trix(df, column='close', n=9, sig=3, ma_method='ema',
         return pd.DataFrame(trix,
                             columns=[f'trix_({n})',
                                      f'trix_signal({sig})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return trix
 
 
 # MACD
 def macd(df, column='close', n_fast=12, n_slow=26, n_macd=9, ma_method='ema',
-         add_col=False, return_struct='numpy'):
+         add_col=False, return_struct='numpy', dtype=np.float64, validate=True):
     """ MACD - Moving average convergence divergence
     
     Parameters
@@ -1670,6 +1834,15 @@ def macd(df, column='close', n_fast=12, n_slow=26, n_macd=9, ma_method='ema',
     return_struct : String, optional. The default is 'numpy'
         Only two values accepted: 'numpy' and 'pandas'. If set to
         'pandas', a new dataframe will be returned.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the result. The averages themselves are still
+        accumulated in double precision, only the stored values are
+        rounded.
+    validate : Boolean, optional. The default is True
+        If set to False, the argument checks are skipped. Only meant for
+        hot loops that call macd repeatedly with arguments that have
+        already been validated by an earlier call.
 
     Returns
     -------
@@ -1682,32 +1855,232 @@ def macd(df, column='close', n_fast=12, n_slow=26, n_macd=9, ma_method='ema',
     return_struct parameter.
     """
     
-    check_errors(df=df, column=column, n_fast=n_fast, n_slow=n_slow,
-                 n_macd=n_macd, ma_method=ma_method, add_col=add_col,
-                 return_struct=return_struct)
+    if validate:
+        check_errors(df=df, column=column, n_fast=n_fast, n_slow=n_slow,
+                     n_macd=n_macd, ma_method=ma_method, add_col=add_col,
+                     return_struct=return_struct, dtype=dtype)
 
-    _ma_func = moving_average_mapper(ma_method)
-
-    ma_fast = _ma_func(df, column=column, n=n_fast, return_struct='pandas')
-    ma_slow = _ma_func(df, column=column, n=n_slow, return_struct='pandas')
-    macd = (ma_fast[f'{ma_method}({n_fast})'] -
-            ma_slow[f'{ma_method}({n_slow})']).to_frame(name='macd')
-    macd['signal'] = _ma_func(macd, column='macd', n=n_macd)
+    if ma_method == 'ema':
+        price = df[column].to_numpy(dtype=np.float64, copy=False)
+        macd = _macd_ema(price, n_fast, n_slow, n_macd, dtype)
+    else:
+        _ma_func = moving_average_np_funcs[ma_method]
 
-    macd = macd.to_numpy()
+        price = df[column].to_numpy(dtype=np.float64, copy=False)
+        line = _ma_func(price, n_fast) - _ma_func(price, n_slow)
+        macd = np.empty((len(df), 2), dtype=dtype, order='F')
+        macd[:, 0] = line
+        macd[:, 1] = _ma_func(line, n_macd)
 
-    if add_col == True:
-        df[f'macd({n_fast},{n_slow})'] = macd[:, 0]
-        df[f'signal({n_macd})'] = macd[:, 1]
+    if add_col:
+        df[[f'macd({n_fast},{n_slow})', f'signal({n_macd})']] = macd
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(macd,
                             columns=[f'macd({n_fast},{n_slow})', f'signal({n_macd})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return macd
 
 
+def _macd_ema(price, n_fast, n_slow, n_macd, dtype):
+    """
+    EMA based MACD and signal line of a 1-d ndarray as an (N, 2) array
+    """
+
+    if min(n_fast, n_slow, n_macd) < 1:
+        raise ValueError("span must satisfy: span >= 1")
+
+    price = np.ascontiguousarray(price, dtype=np.float64)
+    macd = np.empty((len(price), 2), dtype=dtype, order='F')
+    macd_loop(price, n_fast, n_slow, n_macd, _ema_seed(price, n_fast),
+              _ema_seed(price, n_slow), macd[:, 0], macd[:, 1])
+
+    return macd
+
+
+def macd_np(prices, n_fast=12, n_slow=26, n_macd=9, dtype=np.float64):
+    """ MACD of a Numpy Array
+
+    Parameters
+    ----------
+    prices : Numpy ndarray
+        A 1-D array of prices, e.g. a close column already pulled out of
+        its dataframe.
+    n_fast : Int, optional. The default is 12
+        The lookback period for the fast moving average.
+    n_slow : Int, optional. The default is 26
+        The lookback period for the slow moving average.
+    n_macd : Int, optional. The default is 9
+        The lookback period for the signal line.
+    dtype : Numpy dtype, optional. The default is np.float64
+        Only np.float64 and np.float32 accepted. np.float32 halves the
+        memory used by the result.
+
+    Returns
+    -------
+    A numpy array of shape (N, 2) holding the MACD and the signal line,
+    the same as macd returns for a dataframe column holding prices. Only
+    the 'ema' ma_method is supported.
+    """
+
+    if type(prices) is not np.ndarray or prices.ndim != 1:
+        raise Exception("Error: 'prices' must be a 1-D numpy array")
+    check_errors(n_fast=n_fast, n_slow=n_slow, n_macd=n_macd, dtype=dtype)
+
+    return _macd_ema(prices, n_fast, n_slow, n_macd, dtype)
+
+
+def _ewm_state(data, ema, n):
+    """
+    Returns the (weighted, old_wt) pair ema_loop ends on after running
+    over data, so the recurrence can be resumed one value at a time
+    """
+
+    old_wt = 1.0
+    if not np.isnan(ema[-1]):
+        old_wt_factor = 1.0 - 1.0 / (1.0 + (n - 1) / 2)
+        for value in data[::-1]:
+            if not np.isnan(value):
+                break
+            old_wt *= old_wt_factor
+
+    return ema[-1], old_wt
+
+
+def macd_init(df, column='close', n_fast=12, n_slow=26, n_macd=9):
+    """ MACD Streaming State
+
+    Parameters
+    ----------
+    df : Pandas DataFrame
+        A Dataframe containing the columns open/high/low/close/volume
+        with the index being a date. open/high/low/close should all
+        be floats. volume should be an int. The date index should be
+        a Datetime. Must have at least max(n_fast, n_slow, n_macd) rows.
+    column : String, optional. The default is 'close'
+        This is the name of the column you want to operate on.
+    n_fast : Int, optional. The default is 12
+        The lookback period for the fast moving average.
+    n_slow : Int, optional. The default is 26
+        The lookback period for the slow moving average.
+    n_macd : Int, optional. The default is 9
+        The lookback period for the signal line.
+
+    Returns
+    -------
+    A dict holding the state of the three EMAs after the last row of df,
+    to be passed to macd_update as new bars arrive. Only the 'ema'
+    ma_method is supported.
+    """
+
+    check_errors(df=df, column=column, n_fast=n_fast, n_slow=n_slow,
+                 n_macd=n_macd)
+
+    if len(df) < max(n_fast, n_slow, n_macd):
+        raise Exception("Error: df must have at least max(n_fast, n_slow, "
+                        "n_macd) rows")
+
+    price = df[column].to_numpy()
+    ema_fast = moving_average_np_funcs['ema'](price, n_fast)
+    ema_slow = moving_average_np_funcs['ema'](price, n_slow)
+    _macd = ema_fast - ema_slow
+    signal = moving_average_np_funcs['ema'](_macd, n_macd)
+
+    return {
+        'alpha_fast': 1.0 / (1.0 + (n_fast - 1) / 2),
+        'alpha_slow': 1.0 / (1.0 + (n_slow - 1) / 2),
+        'alpha_signal': 1.0 / (1.0 + (n_macd - 1) / 2),
+        'fast': _ewm_state(price, ema_fast, n_fast),
+        'slow': _ewm_state(price, ema_slow, n_slow),
+        'signal': _ewm_state(_macd, signal, n_macd),
+        }
+
+
+def macd_update(state, price):
+    """ MACD Streaming Update
+
+    Parameters
+    ----------
+    state : Dict
+        The state returned by macd_init. It is updated in place.
+    price : Float
+        The value of the new bar.
+
+    Returns
+    -------
+    A (macd, signal) tuple for the new bar, equal to the last row macd
+    would return on the full history including this bar.
+    """
+
+    price = float(price)
+    state['fast'] = ewm_step(price, *state['fast'], state['alpha_fast'])
+    state['slow'] = ewm_step(price, *state['slow'], state['alpha_slow'])
+    _macd = state['fast'][0] - state['slow'][0]
+    state['signal'] = ewm_step(_macd, *state['signal'], state['alpha_signal'])
+
+    return _macd, state['signal'][0]
+
+
+def macd_many(prices, n_fast=12, n_slow=26, n_macd=9, max_workers=None):
+    """ MACD Over Many Symbols at Once
+
+    Parameters
+    ----------
+    prices : Numpy ndarray
+        A 2-D array of shape (rows, symbols) with one column of prices
+        per symbol, e.g. the close of every ticker aligned on the same
+        dates.
+    n_fast : Int, optional. The default is 12
+        The lookback period for the fast moving average.
+    n_slow : Int, optional. The default is 26
+        The lookback period for the slow moving average.
+    n_macd : Int, optional. The default is 9
+        The lookback period for the signal line.
+    max_workers : Int, optional. The default is None
+        The number of worker threads the symbols are split across. If
+        None, os.cpu_count() is used.
+
+    Returns
+    -------
+    A numpy array of shape (rows, symbols, 2) holding the MACD in
+    [:, :, 0] and the signal line in [:, :, 1]. Each symbol's values are
+    the same as macd would return for that column alone. Only the 'ema'
+    ma_method is supported.
+    """
+
+    if type(prices) is not np.ndarray or prices.ndim != 2:
+        raise Exception("Error: 'prices' must be a 2-D numpy array")
+
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    check_errors(n_fast=n_fast, n_slow=n_slow, n_macd=n_macd,
+                 max_workers=max_workers)
+
+    if min(n_fast, n_slow, n_macd) < 1:
+        raise ValueError("span must satisfy: span >= 1")
+
+    prices = np.asfortranarray(prices, dtype=np.float64)
+    rows, symbols = prices.shape
+    seeds_fast = _ema_seeds(prices, n_fast)
+    seeds_slow = _ema_seeds(prices, n_slow)
+    macd = np.empty((rows, symbols, 2), order='F')
+
+    # The kernel releases the GIL, so each thread works through its own
+    # block of columns
+    bounds = np.linspace(0, symbols, min(max_workers, symbols) + 1).astype(int)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(macd_many_loop, prices[:, lo:hi], n_fast,
+                                   n_slow, n_macd, seeds_fast[lo:hi],
+                                   seeds_slow[lo:hi], macd[:, lo:hi])
+                   for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+
+    for future in futures:
+        future.result()
+
+    return macd
+
+
 # Triangular RSI
 def triangular_rsi(df, column='close', n=5, ma_method='sma',
                    add_col=False, return_struct='numpy'):
@@ -1756,13 +2129,13 @@ def triangular_rsi(df, column='close', n=5, ma_method='sma',
                 return_struct='pandas')
     tri_rsi = rsi(rsi_2, column=f'rsi({n})', n=n, ma_method=ma_method)
 
-    if add_col == True:
+    if add_col:
         df[f'triangular_rsi({n})'] = tri_rsi
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(tri_rsi,
                             columns=[f'triangular_rsi({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return tri_rsi
 
@@ -1809,24 +2182,25 @@ def mass_index(df, n=9, n_sum=25, ma_method='ema',
     check_errors(df=df, n=n, n_sum=n_sum, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    high_low = (df['high'] - df['low']).to_frame(name='close')
-    ma_1 = _ma_func(high_low, n=n, return_struct='pandas')
-    ma_2 = _ma_func(ma_1, column=f'{ma_method}({n})', n=n, return_struct='pandas')
-    mass = ma_1 / ma_2
+    ma_1 = _ma_func((df['high'] - df['low']).to_numpy(), n)
+    ma_2 = _ma_func(ma_1, n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mass = ma_1 / ma_2
 
-    mass_idx = (mass.rolling(n_sum).sum()).to_numpy()
+    mass_idx = pd.Series(mass, copy=False).rolling(n_sum).sum().to_numpy()
 
-    if add_col == True:
+    if add_col:
         df[f'mass_index({n},{n_sum})'] = mass_idx
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(mass_idx,
                             columns=[f'mass_index({n},{n_sum})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
-        return mass_idx
+        # Kept as an (N, 1) column, the shape mass_index has always returned
+        return mass_idx[:, None]
 
 
 # Vortex Indicator
@@ -1863,27 +2237,33 @@ def vortex(df, n=5, add_col=False, return_struct='numpy'):
 
     check_errors(df=df, n=n, add_col=add_col, return_struct=return_struct)
 
-    vm_pos = abs(df['high'] - df['low'].shift(1))
-    vm_neg = abs(df['low'] - df['high'].shift(1))
-    tr = true_range(df, return_struct='pandas')
-
-    vm_pos_sum = vm_pos.rolling(n).sum()
-    vm_neg_sum = vm_neg.rolling(n).sum()
-    tr_sum = tr['true_range'].rolling(n).sum()
-
-    vtx_pos = vm_pos_sum / tr_sum
-    vtx_neg = vm_neg_sum / tr_sum
-
-    vtx = np.vstack((vtx_pos, vtx_neg)).transpose()
-
-    if add_col == True:
+    high = df['high'].to_numpy()
+    low = df['low'].to_numpy()
+    vm_pos = np.full(len(df), np.nan)
+    vm_neg = np.full(len(df), np.nan)
+    np.subtract(high[1:], low[:-1], out=vm_pos[1:])
+    np.subtract(low[1:], high[:-1], out=vm_neg[1:])
+    np.abs(vm_pos, out=vm_pos)
+    np.abs(vm_neg, out=vm_neg)
+    tr = pd.Series(_true_range(df), copy=False)
+
+    vm_pos_sum = pd.Series(vm_pos).rolling(n).sum().to_numpy(copy=False)
+    vm_neg_sum = pd.Series(vm_neg).rolling(n).sum().to_numpy(copy=False)
+    tr_sum = tr.rolling(n).sum().to_numpy(copy=False)
+
+    vtx = np.empty((len(df), 2), order='F')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(vm_pos_sum, tr_sum, out=vtx[:, 0])
+        np.divide(vm_neg_sum, tr_sum, out=vtx[:, 1])
+
+    if add_col:
         df[f'vortex_pos({n})'] = vtx[:, 0]
         df[f'vortex_neg({n})'] = vtx[:, 1]
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(vtx,
                             columns=[f'vortex_pos({n})', f'vortex_neg({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return vtx
 
@@ -1948,35 +2328,25 @@ def kst(df, n_1=10, n_2=15, n_3=20, n_4=30, ma_1=10, ma_2=10, ma_3=10, ma_4=15,
                  sig=sig, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    roc_1 = rate_of_change(df, n=n_1, return_struct='pandas')
-    roc_2 = rate_of_change(df, n=n_2, return_struct='pandas')
-    roc_3 = rate_of_change(df, n=n_3, return_struct='pandas')
-    roc_4 = rate_of_change(df, n=n_4, return_struct='pandas')
-
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    roc_ma_1 = _ma_func(roc_1, column=f'roc({n_1})', n=ma_1, return_struct='pandas')
-    roc_ma_2 = _ma_func(roc_2, column=f'roc({n_2})', n=ma_2, return_struct='pandas')
-    roc_ma_3 = _ma_func(roc_3, column=f'roc({n_3})', n=ma_3, return_struct='pandas')
-    roc_ma_4 = _ma_func(roc_4, column=f'roc({n_4})', n=ma_4, return_struct='pandas')
+    roc_ma_1 = _ma_func(rate_of_change(df, n=n_1), ma_1)
+    roc_ma_2 = _ma_func(rate_of_change(df, n=n_2), ma_2)
+    roc_ma_3 = _ma_func(rate_of_change(df, n=n_3), ma_3)
+    roc_ma_4 = _ma_func(rate_of_change(df, n=n_4), ma_4)
 
-    kst = pd.DataFrame(roc_ma_1[f'{ma_method}({ma_1})'] +
-                       roc_ma_2[f'{ma_method}({ma_2})'] * 2 +
-                       roc_ma_3[f'{ma_method}({ma_3})'] * 3 +
-                       roc_ma_4[f'{ma_method}({ma_4})'] * 4 ,
-                       columns=['close'])
-    kst['signal'] = _ma_func(kst, n=sig)
+    kst = np.empty((len(df), 2), order='F')
+    kst[:, 0] = roc_ma_1 + roc_ma_2 * 2 + roc_ma_3 * 3 + roc_ma_4 * 4
+    kst[:, 1] = _ma_func(kst[:, 0], sig)
 
-    kst = kst.to_numpy()
-
-    if add_col == True:
+    if add_col:
         df['kst'] = kst[:, 0]
         df['kst_signal'] = kst[:, 1]
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(kst,
                             columns=['kst', 'kst_signal'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return kst
 
@@ -2025,23 +2395,26 @@ def cci(df, n=14, ma_method='sma', constant=0.015,
     check_errors(df=df, n=n, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    pp = ((df['high'] + df['low'] + df['close']) / 3).to_frame(name='close')
+    pp = ((df['high'] + df['low'] + df['close']) / 3).to_numpy()
     mad_func = lambda x: np.fabs(x - x.mean()).mean()
-    mad = pp.rolling(n).apply(mad_func)
+    mad = pd.Series(pp, copy=False).rolling(n).apply(mad_func,
+                                                      raw=True).to_numpy()
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    pp_avg = _ma_func(pp, n=n)
+    pp_avg = _ma_func(pp, n)
 
-    cci = ((pp['close'] - pp_avg) / (mad['close'] * constant)).to_numpy()
+    cci = np.subtract(pp, pp_avg)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cci /= mad * constant
 
-    if add_col == True:
+    if add_col:
         df[f'cci({n})'] = cci
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(cci,
                             columns=[f'cci({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return cci
 
@@ -2094,18 +2467,18 @@ def chaikin_oscillator(df, n_slow=10, n_fast=3, ma_method='ema',
             (df['high'] - df['low']))
 
     mfv = mfm * df['volume']
-    adl = (mfv.cumsum()).to_frame(name='close')
+    adl = mfv.cumsum().to_numpy()
 
-    _ma_func = moving_average_mapper(ma_method)
-    chaikin = _ma_func(adl, n=n_fast) - _ma_func(adl, n=n_slow)
+    _ma_func = moving_average_np_funcs[ma_method]
+    chaikin = _ma_func(adl, n_fast) - _ma_func(adl, n_slow)
 
-    if add_col == True:
+    if add_col:
         df[f'chaikin({n_slow},{n_fast})'] = chaikin
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(chaikin,
                             columns=[f'chaikin({n_slow},{n_fast})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return chaikin
 
@@ -2160,15 +2533,15 @@ def money_flow_index(df, n=14, add_col=False, return_struct='numpy'):
     sum_dn = abs(dn).rolling(n).sum()
     mfr = sum_up / sum_dn
 
-    mfi = (100.0 - 100.0 / (1 + mfr)).to_numpy()
+    mfi = (100.0 - 100.0 / (1 + mfr)).to_numpy(copy=False)
 
-    if add_col == True:
+    if add_col:
         df[f'mfi({n})'] = mfi
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(mfi,
                             columns=[f'mfi({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return mfi
 
@@ -2217,19 +2590,19 @@ def force_index(df, column='close', n=13, ma_method='ema',
     check_errors(df=df, column=column, n=n, ma_method=ma_method,
                  add_col=add_col, return_struct=return_struct)
 
-    force = (df[column].diff(1).fillna(0) * df['volume']).to_frame(name='close')
+    force = (df[column].diff(1).fillna(0) * df['volume']).to_numpy()
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    fi = _ma_func(force, n=n)
+    fi = _ma_func(force, n)
 
-    if add_col == True:
+    if add_col:
         df[f'force_index({n})'] = fi
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(fi,
                             columns=[f'force_index({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return fi
 
@@ -2285,19 +2658,19 @@ def ease_of_movement(df, n=14, ma_method='sma',
     scaled_volume = df['volume'] / df['volume'].max()
 
     box_ratio = scaled_volume / (df['high'] - df['low'])
-    eom_raw = (distance / box_ratio).to_frame(name='close')
+    eom_raw = (distance / box_ratio).to_numpy()
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    eom = _ma_func(eom_raw, n=n)
+    eom = _ma_func(eom_raw, n)
 
-    if add_col == True:
+    if add_col:
         df[f'ease_of_movement({n})'] = eom
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(eom,
                             columns=[f'ease_of_movement({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return eom
 
@@ -2349,22 +2722,20 @@ def coppock(df, column='close', n_1=14, n_2=11, ma_1=10, ma_method='wma',
     check_errors(df=df, column=column, n_1=n_1, n_2=n_2, ma_1=ma_1,
                  ma_method=ma_method, add_col=add_col, return_struct=return_struct)
 
-    roc_1 = rate_of_change(df, column=column, n=n_1, return_struct='pandas')
-    roc_2 = rate_of_change(df, column=column, n=n_2, return_struct='pandas')
-
-    roc_sum = (roc_1[f'roc({n_1})'] + roc_2[f'roc({n_2})']).to_frame(name='close')
+    roc_sum = np.add(rate_of_change(df, column=column, n=n_1),
+                     rate_of_change(df, column=column, n=n_2))
 
-    _ma_func = moving_average_mapper(ma_method)
+    _ma_func = moving_average_np_funcs[ma_method]
 
-    coppock = _ma_func(roc_sum, n=ma_1)
+    coppock = _ma_func(roc_sum, ma_1)
 
-    if add_col == True:
+    if add_col:
         df[f'coppock({n_1},{n_2},{ma_1})'] = coppock
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(coppock,
                             columns=[f'coppock({n_1},{n_2},{ma_1})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return coppock
 
@@ -2403,13 +2774,12 @@ def donchian_channels(df, n=20, add_col=False, return_struct='numpy'):
 
     check_errors(df=df, n=n, add_col=add_col, return_struct=return_struct)
 
-    upper = df['high'].rolling(n).max()
-    lower = df['low'].rolling(n).min()
-    center = (upper + lower) / 2
-
-    donchian = np.vstack((lower, center, upper)).transpose()
+    donchian = np.empty((len(df), 3), order='F')
+    donchian[:, 0], donchian[:, 2] = _rolling_low_high(df, n)
+    np.add(donchian[:, 2], donchian[:, 0], out=donchian[:, 1])
+    donchian[:, 1] /= 2
 
-    if add_col == True:
+    if add_col:
         df[f'donchian_lower({n})'] = donchian[:, 0]
         df[f'donchian_center({n})'] = donchian[:, 1]
         df[f'donchian_upper({n})'] = donchian[:, 2]
@@ -2419,7 +2789,7 @@ def donchian_channels(df, n=20, add_col=False, return_struct='numpy'):
                             columns=[f'donchian_lower({n})',
                                      f'donchian_center({n})',
                                      f'donchian_upper({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return donchian
 
@@ -2463,15 +2833,164 @@ def choppiness(df, n=14, add_col=False, return_struct='numpy'):
     ll = df['low'].rolling(n).min()
     choppiness = (100 *
                   np.log10(_atr['atr_sma(1)'].rolling(n).sum() / (hh - ll)) /
-                  np.log10(n)).to_numpy()
+                  np.log10(n)).to_numpy(copy=False)
 
-    if add_col == True:
+    if add_col:
         df[f'choppiness({n})'] = choppiness
         return df
     elif return_struct == 'pandas':
         return pd.DataFrame(choppiness,
                             columns=[f'choppiness({n})'],
-                            index=df.index)
+                            index=df.index, copy=False)
     else:
         return choppiness
 
+
+# Indicators compute_all can dispatch to by name
+indicator_funcs = {
+    'returns': returns,
+    'hvol': hvol,
+    'momentum': momentum,
+    'rate_of_change': rate_of_change,
+    'true_range': true_range,
+    'atr': atr,
+    'atr_percent': atr_percent,
+    'keltner_channels': keltner_channels,
+    'bollinger_bands': bollinger_bands,
+    'rsi': rsi,
+    'tsi': tsi,
+    'adx': adx,
+    'parabolic_sar': parabolic_sar,
+    'supertrend': supertrend,
+    'acc_dist': acc_dist,
+    'obv': obv,
+    'trad_pivots': trad_pivots,
+    'classic_pivots': classic_pivots,
+    'fibonacci_pivots': fibonacci_pivots,
+    'woodie_pivots': woodie_pivots,
+    'demark_pivots': demark_pivots,
+    'camarilla_pivots': camarilla_pivots,
+    'stochastic': stochastic,
+    'stochastic_rsi': stochastic_rsi,
+    'rsi_stochastic': rsi_stochastic,
+    'ultimate_oscillator': ultimate_oscillator,
+    'trix': trix,
+    'macd': macd,
+    'triangular_rsi': triangular_rsi,
+    'mass_index': mass_index,
+    'vortex': vortex,
+    'kst': kst,
+    'cci': cci,
+    'chaikin_oscillator': chaikin_oscillator,
+    'money_flow_index': money_flow_index,
+    'force_index': force_index,
+    'ease_of_movement': ease_of_movement,
+    'coppock': coppock,
+    'donchian_channels': donchian_channels,
+    'choppiness': choppiness,
+    'sma': sma,
+    'ema': ema,
+    'wma': wma,
+    'hma': hma,
+    'wilders_ma': wilders_ma,
+    'kama': kama,
+    'fma': fma,
+    }
+
+
+def compute_all(df, specs, max_workers=None):
+    """ Compute Several Indicators Concurrently
+
+    Parameters
+    ----------
+    df : Pandas DataFrame
+        A Dataframe containing the columns open/high/low/close/volume
+        with the index being a date. open/high/low/close should all
+        be floats. volume should be an int. The date index should be
+        a Datetime.
+    specs : List of tuples
+        One (indicator_name, kwargs) tuple per indicator to compute,
+        e.g. [('rsi', {'n': 14}), ('atr', {'ma_method': 'wilders'})].
+        indicator_name must be a key of indicator_funcs. kwargs may be
+        an empty dict. add_col is not supported because the indicators
+        run at the same time on the same dataframe. parallel=True is not
+        supported either, see bollinger_bands.
+    max_workers : Int, optional. The default is None
+        The number of worker threads. If None, os.cpu_count() is used.
+
+    Returns
+    -------
+    A list with the result of each indicator, in the same order as specs.
+    Each result follows that indicator's return_struct argument.
+
+    Note: The Numba helper loops release the GIL, so indicators built on
+    them run in parallel across threads.
+    """
+
+    check_errors(df=df)
+
+    funcs = []
+    for name, kwargs in specs:
+        func = indicator_funcs.get(name)
+        if func is None:
+            raise ValueError(f"Invalid indicator: {name}. Valid indicators: "
+                             f"{', '.join(indicator_funcs)}")
+        if kwargs.get('add_col', False):
+            raise Exception("Error: add_col is not supported in compute_all")
+        if kwargs.get('parallel', False):
+            raise Exception("Error: parallel is not supported in compute_all")
+        funcs.append((func, kwargs))
+
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    check_errors(max_workers=max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, df, **kwargs)
+                   for func, kwargs in funcs]
+
+    return [future.result() for future in futures]
+
+
+def parallel_apply(dfs, func, max_workers=None, **kwargs):
+    """ Apply One Indicator to Several DataFrames Concurrently
+
+    Parameters
+    ----------
+    dfs : Dict of Pandas DataFrames
+        One Dataframe per ticker, keyed by ticker, each containing the
+        columns the indicator needs.
+    func : Function
+        The indicator to apply, e.g. parabolic_sar or supertrend.
+    max_workers : Int, optional. The default is None
+        The number of worker threads. If None, os.cpu_count() is used.
+    **kwargs :
+        Keyword arguments passed to func on every call. parallel=True is
+        not supported, see bollinger_bands.
+
+    Returns
+    -------
+    A dict with the same keys as dfs holding the result of func on each
+    dataframe. Each result follows the return_struct and add_col
+    arguments passed in kwargs.
+
+    Note: The Numba helper loops release the GIL, so indicators built on
+    them run in parallel across threads.
+    """
+
+    if type(dfs) is not dict:
+        raise Exception("Error: 'dfs' must be a dict of Pandas DataFrames")
+    if not callable(func):
+        raise Exception("Error: 'func' must be an indicator function")
+    if kwargs.get('parallel', False):
+        raise Exception("Error: parallel is not supported in parallel_apply")
+
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    check_errors(max_workers=max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {key: executor.submit(func, df, **kwargs)
+                   for key, df in dfs.items()}
+
+    return {key: future.result() for key, future in futures.items()}